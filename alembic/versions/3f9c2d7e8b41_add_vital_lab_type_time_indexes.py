@@ -0,0 +1,30 @@
+"""add_vital_lab_type_time_indexes
+
+Revision ID: 3f9c2d7e8b41
+Revises: 1ca59bbe2e79
+Create Date: 2026-10-15 10:12:41.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7e8b41'
+down_revision: Union[str, Sequence[str], None] = '1ca59bbe2e79'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_vitals_patient_type_time', 'vitals', ['patient_id', 'vital_type', sa.text('recorded_at DESC')], unique=False)
+    op.create_index('ix_labs_patient_type_time', 'labs', ['patient_id', 'lab_type', sa.text('recorded_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_labs_patient_type_time', table_name='labs')
+    op.drop_index('ix_vitals_patient_type_time', table_name='vitals')
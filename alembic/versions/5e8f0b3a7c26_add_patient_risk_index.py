@@ -0,0 +1,28 @@
+"""add_patient_risk_index
+
+Revision ID: 5e8f0b3a7c26
+Revises: c4d1e7a92f58
+Create Date: 2026-10-15 14:20:53.902417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8f0b3a7c26'
+down_revision: Union[str, Sequence[str], None] = 'c4d1e7a92f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_patients_risk_desc', 'patients', [sa.text('current_risk_score DESC'), 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_patients_risk_desc', table_name='patients')
@@ -0,0 +1,42 @@
+"""add_patient_time_indexes
+
+Revision ID: 8b2e4a6c1d93
+Revises: 3f9c2d7e8b41
+Create Date: 2026-10-15 11:02:17.584210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2e4a6c1d93'
+down_revision: Union[str, Sequence[str], None] = '3f9c2d7e8b41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ('ix_vitals_patient_time', 'vitals', ['patient_id', sa.text('recorded_at DESC')]),
+    ('ix_labs_patient_time', 'labs', ['patient_id', sa.text('recorded_at DESC')]),
+    ('ix_clinical_notes_patient_time', 'clinical_notes', ['patient_id', sa.text('created_at DESC')]),
+    ('ix_risk_scores_patient_time', 'risk_scores', ['patient_id', sa.text('computed_at DESC')]),
+    ('ix_alerts_status_time', 'alerts', ['status', sa.text('created_at DESC')]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY can't run inside a transaction on Postgres; ignored elsewhere.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,28 @@
+"""add_alert_patient_time_index
+
+Revision ID: 9a6c2f1e4b07
+Revises: 5e8f0b3a7c26
+Create Date: 2026-10-15 14:52:38.117604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a6c2f1e4b07'
+down_revision: Union[str, Sequence[str], None] = '5e8f0b3a7c26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_alerts_patient_time', 'alerts', ['patient_id', sa.text('created_at DESC')], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alerts_patient_time', table_name='alerts')
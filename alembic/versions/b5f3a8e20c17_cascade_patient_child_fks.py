@@ -0,0 +1,49 @@
+"""cascade_patient_child_fks
+
+Revision ID: b5f3a8e20c17
+Revises: e2b7d4f19a36
+Create Date: 2026-10-15 15:48:51.206374
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5f3a8e20c17'
+down_revision: Union[str, Sequence[str], None] = 'e2b7d4f19a36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+TABLES = ['vitals', 'labs', 'clinical_notes']
+
+# The tables were created without named constraints. Postgres names them
+# <table>_patient_id_fkey; SQLite batch mode needs a convention to find them.
+SQLITE_NAMING = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _fk_name(table: str) -> str:
+    if op.get_bind().dialect.name == 'sqlite':
+        return f'fk_{table}_patient_id_patients'
+    return f'{table}_patient_id_fkey'
+
+
+def _replace_patient_fk(ondelete: Union[str, None]) -> None:
+    for table in TABLES:
+        name = _fk_name(table)
+        with op.batch_alter_table(table, naming_convention=SQLITE_NAMING) as batch_op:
+            batch_op.drop_constraint(name, type_='foreignkey')
+            batch_op.create_foreign_key(name, 'patients', ['patient_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _replace_patient_fk('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _replace_patient_fk(None)
@@ -0,0 +1,28 @@
+"""add_patient_created_by_index
+
+Revision ID: c4d1e7a92f58
+Revises: 8b2e4a6c1d93
+Create Date: 2026-10-15 13:41:06.317842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d1e7a92f58'
+down_revision: Union[str, Sequence[str], None] = '8b2e4a6c1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_patients_created_by'), 'patients', ['created_by'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_patients_created_by'), table_name='patients')
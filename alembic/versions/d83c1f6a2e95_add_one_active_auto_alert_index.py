@@ -0,0 +1,46 @@
+"""add_one_active_auto_alert_index
+
+Revision ID: d83c1f6a2e95
+Revises: b5f3a8e20c17
+Create Date: 2026-10-15 16:17:42.830159
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd83c1f6a2e95'
+down_revision: Union[str, Sequence[str], None] = 'b5f3a8e20c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Keep the newest active auto-generated alert per patient; older duplicates
+# (left by the old check-then-insert path) are dismissed so the index can build.
+DISMISS_DUPLICATES = sa.text("""
+    UPDATE alerts SET status = 'dismissed'
+    WHERE status = 'active' AND auto_generated = TRUE AND id NOT IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY patient_id ORDER BY created_at DESC) AS rn
+            FROM alerts WHERE status = 'active' AND auto_generated = TRUE
+        ) ranked WHERE rn = 1
+    )
+""")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(DISMISS_DUPLICATES)
+    op.create_index(
+        'ix_alerts_one_active_auto', 'alerts', ['patient_id'], unique=True,
+        postgresql_where=sa.text("status = 'active' AND auto_generated = true"),
+        sqlite_where=sa.text("status = 'active' AND auto_generated = 1"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_alerts_one_active_auto', table_name='alerts')
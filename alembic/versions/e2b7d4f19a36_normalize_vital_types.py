@@ -0,0 +1,42 @@
+"""normalize_vital_types
+
+Revision ID: e2b7d4f19a36
+Revises: 9a6c2f1e4b07
+Create Date: 2026-10-15 15:21:04.392817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7d4f19a36'
+down_revision: Union[str, Sequence[str], None] = '9a6c2f1e4b07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Legacy camelCase vital types -> canonical snake_case (mirrors VITAL_TYPE_CANON)
+RENAMES = [
+    ('heartRate', 'heart_rate'),
+    ('bloodPressure', 'blood_pressure'),
+    ('oxygenSat', 'oxygen_sat'),
+    ('respiratoryRate', 'respiratory_rate'),
+]
+
+UPDATE_VITAL_TYPE = sa.text("UPDATE vitals SET vital_type = :new WHERE vital_type = :old")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for old, new in RENAMES:
+        op.execute(UPDATE_VITAL_TYPE.bindparams(old=old, new=new))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Data-only migration; snake_case rows can't be told apart from ones
+    # originally written that way, so there is nothing to undo.
+    pass
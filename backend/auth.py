@@ -5,31 +5,57 @@ JWT-based authentication with role-based access control.
 """
 
 import os
-from typing import Optional, List
-from datetime import datetime, timedelta
-from jose import jwt, JWTError
+import json
+import time
+import base64
+import hashlib
+import hmac
+from functools import lru_cache
+from hmac import compare_digest
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta, timezone
+from jose import jwt, JWTError, ExpiredSignatureError
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
 
 # Configuration - Use environment variable in production
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "dev-only-fallback-change-in-production")
+SECRET_KEY_BYTES = SECRET_KEY.encode()
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+_DEFAULT_EXPIRE_DELTA = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - argon2id for new hashes; bcrypt kept so existing hashes
+# still verify and get upgraded on next successful login.
+# Dev environments can lower BCRYPT_ROUNDS (e.g. 4-6) for faster logins.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["argon2", "bcrypt"],
+    deprecated="auto",
+    argon2__time_cost=2,
+    argon2__memory_cost=19456,
+    argon2__parallelism=1,
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
 
 # Security scheme
 security = HTTPBearer(auto_error=False)
 
+# Decoded token cache - avoids re-running jwt.decode for repeated bearer tokens
+_CACHE_TTL = 300  # seconds
+_CACHE_MAXSIZE = 4096
+
 
 # =============================================================================
 # TOKEN MODELS
 # =============================================================================
 
-class TokenData(BaseModel):
+@dataclass(frozen=True, slots=True)
+class TokenData:
+    """Decoded token claims. Immutable, since instances are shared via the token cache."""
     user_id: str
     email: str
     role: str
@@ -37,6 +63,14 @@ class TokenData(BaseModel):
     exp: Optional[datetime] = None
 
 
+# Token digest -> (cache entry expiry as epoch seconds, decoded TokenData).
+# Keyed by a digest so raw bearer tokens aren't held in memory.
+_TOKEN_CACHE: "OrderedDict[str, Tuple[float, TokenData]]" = OrderedDict()
+
+# Token digest -> token exp (epoch seconds) for tokens revoked before expiry
+_REVOKED_TOKENS: dict = {}
+
+
 # =============================================================================
 # TOKEN FUNCTIONS
 # =============================================================================
@@ -44,16 +78,40 @@ class TokenData(BaseModel):
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    expire = datetime.now(timezone.utc) + (expires_delta or _DEFAULT_EXPIRE_DELTA)
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a plain password against a hashed password."""
+    """
+    Verify a plain password against a hashed password.
+    Also accepts legacy unsalted SHA-256 hex digests from older databases.
+    """
+    if pwd_context.identify(hashed_password) is None:
+        legacy = hashlib.sha256(plain_password.encode()).hexdigest()
+        return constant_time_equals(legacy, hashed_password)
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def constant_time_equals(a: str, b: str) -> bool:
+    """Compare two secrets without leaking timing information."""
+    return compare_digest(a.encode(), b.encode())
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password and return (valid, new_hash).
+    new_hash is set when the stored hash uses a deprecated scheme (bcrypt or a
+    legacy SHA-256 digest) and should be persisted by the caller.
+    """
+    if pwd_context.identify(hashed_password) is None:
+        if not verify_password(plain_password, hashed_password):
+            return False, None
+        return True, hash_password(plain_password)
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def hash_password(password: str) -> str:
     """Hash a password."""
     return pwd_context.hash(password)
@@ -63,6 +121,101 @@ def hash_password(password: str) -> str:
 # TASK-6.1: JWT VALIDATION MIDDLEWARE
 # =============================================================================
 
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_hs256(token: str) -> dict:
+    """
+    Verify and decode an HS256 JWT with a direct HMAC check against the
+    precomputed key. Tokens this path doesn't handle (other algorithms,
+    extra registered claims) are passed through to jose.
+    Raises JWTError on any invalid token.
+    """
+    try:
+        header_b64, payload_b64, sig_b64 = token.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        if header.get("alg") != ALGORITHM:
+            return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        signature = _b64url_decode(sig_b64)
+        payload = json.loads(_b64url_decode(payload_b64))
+    except (ValueError, TypeError, AttributeError):
+        raise JWTError("Malformed token")
+
+    expected = hmac.new(SECRET_KEY_BYTES, f"{header_b64}.{payload_b64}".encode(), hashlib.sha256).digest()
+    if not compare_digest(expected, signature):
+        raise JWTError("Signature verification failed.")
+
+    if not isinstance(payload, dict) or any(claim in payload for claim in ("nbf", "iat", "aud", "iss")):
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+    exp = payload.get("exp")
+    if exp is not None:
+        if not isinstance(exp, (int, float)):
+            raise JWTError("Expiration Time claim (exp) must be an integer.")
+        if exp < time.time():
+            raise ExpiredSignatureError("Signature has expired.")
+    return payload
+
+
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:32]
+
+
+def _decode_token(token: str) -> TokenData:
+    """
+    Decode a JWT into TokenData, reusing a cached result when available.
+    Cache entries never outlive the token's own `exp` claim.
+    Raises JWTError if the token is invalid, expired or revoked.
+    """
+    now = time.time()
+    key = _token_key(token)
+    if key in _REVOKED_TOKENS:
+        raise JWTError("Token has been revoked")
+    entry = _TOKEN_CACHE.get(key)
+    if entry is not None:
+        expires_at, token_data = entry
+        if expires_at > now:
+            _TOKEN_CACHE.move_to_end(key)
+            return token_data
+        del _TOKEN_CACHE[key]
+
+    payload = _decode_hs256(token)
+    user_id = payload.get("user_id", payload.get("sub"))
+    if user_id is None:
+        raise JWTError("Token has no user_id/sub claim")
+    exp = payload.get("exp", 0)
+    token_data = TokenData(
+        user_id=user_id,
+        email=payload.get("email", ""),
+        role=payload.get("role", "user"),
+        name=payload.get("name"),
+        exp=datetime.fromtimestamp(exp),
+    )
+
+    expires_at = min(now + _CACHE_TTL, exp)
+    if expires_at > now:
+        _TOKEN_CACHE[key] = (expires_at, token_data)
+        if len(_TOKEN_CACHE) > _CACHE_MAXSIZE:
+            _TOKEN_CACHE.popitem(last=False)
+    return token_data
+
+
+def revoke_token(token: str) -> None:
+    """
+    Reject a token for the rest of its lifetime (e.g. on logout or password
+    change) and drop it from the decode cache. Per-process, like the cache.
+    """
+    now = time.time()
+    key = _token_key(token)
+    entry = _TOKEN_CACHE.pop(key, None)
+    exp = entry[1].exp.timestamp() if entry and entry[1].exp else now + ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    _REVOKED_TOKENS[key] = exp
+    # Expired tokens fail verification anyway; stop tracking them
+    for stale in [k for k, e in _REVOKED_TOKENS.items() if e < now]:
+        del _REVOKED_TOKENS[stale]
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)) -> TokenData:
     """
     Verify JWT token and return decoded payload.
@@ -76,15 +229,10 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security))
         )
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        return TokenData(
-            user_id=payload.get("user_id", payload.get("sub")),
-            email=payload.get("email", ""),
-            role=payload.get("role", "user"),
-            name=payload.get("name"),
-            exp=datetime.fromtimestamp(payload.get("exp", 0)),
-        )
+        return _decode_token(credentials.credentials)
     except JWTError as e:
+        # Build a throwaway TokenData so failure takes comparable time to success
+        TokenData(user_id="", email="", role="", name=None, exp=datetime.fromtimestamp(0))
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Invalid or expired token: {str(e)}",
@@ -101,14 +249,7 @@ def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(securi
         return None
     
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        return TokenData(
-            user_id=payload.get("user_id", payload.get("sub")),
-            email=payload.get("email", ""),
-            role=payload.get("role", "user"),
-            name=payload.get("name"),
-            exp=datetime.fromtimestamp(payload.get("exp", 0)),
-        )
+        return _decode_token(credentials.credentials)
     except JWTError:
         return None
 
@@ -117,17 +258,21 @@ def get_optional_user(credentials: HTTPAuthorizationCredentials = Depends(securi
 # TASK-6.3: ROLE-BASED ACCESS CONTROL
 # =============================================================================
 
+@lru_cache(maxsize=32)
 def require_role(*allowed_roles: str):
     """
     Dependency factory that checks if user has one of the allowed roles.
     Usage: Depends(require_role("admin", "doctor"))
+
+    Checkers are cached per role tuple, so repeated call sites share one
+    dependency with a prebuilt role set and error message.
     """
+    allowed = frozenset(allowed_roles)
+    detail = f"Insufficient permissions. Required role: {' or '.join(allowed_roles)}"
+
     def role_checker(user: TokenData = Depends(verify_token)) -> TokenData:
-        if user.role not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Insufficient permissions. Required role: {' or '.join(allowed_roles)}",
-            )
+        if user.role not in allowed:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
         return user
     return role_checker
 
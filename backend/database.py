@@ -17,13 +17,15 @@ Examples:
 """
 
 import os
-from datetime import datetime
+import time
+from datetime import datetime, timezone
 from typing import Optional, List
 from pathlib import Path
 
-from sqlalchemy import create_engine, Column, String, Integer, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import create_engine, event, Column, String, Integer, Float, DateTime, ForeignKey, Text, Boolean, Index, and_, literal_column, true
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -38,21 +40,111 @@ DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./data/clinical.db")
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Set when DATABASE_URL points at PgBouncer in transaction pooling mode, where
+# server-side prepared statements can't be reused across transactions
+PGBOUNCER = os.getenv("PGBOUNCER", "").lower() in ("1", "true", "yes")
+
 # SQLite needs special connect args
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+connect_args = {"check_same_thread": False} if IS_SQLITE else {}
+
+# Pool settings for server databases (SQLite uses SQLAlchemy's default pool)
+engine_kwargs = {"query_cache_size": 2048}
+if not IS_SQLITE:
+    engine_kwargs.update(
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "40")),
+        pool_pre_ping=True,
+        pool_recycle=1800,
+        pool_use_lifo=True,  # reuse warm connections; idle extras age out via pool_recycle
+    )
+    # psycopg3 keeps server-side prepared statements after N executions
+    if DATABASE_URL.startswith("postgresql+psycopg://"):
+        connect_args["prepare_threshold"] = None if PGBOUNCER else 5
 
 # Create engine
-engine = create_engine(DATABASE_URL, connect_args=connect_args, echo=False)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+engine = create_engine(DATABASE_URL, connect_args=connect_args, echo=False, **engine_kwargs)
+
+
+if IS_SQLITE:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        WAL lets readers proceed during writes; NORMAL sync is safe under WAL.
+        Foreign keys are off by default in SQLite; writes rely on them.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+# Like the async sessions, don't expire on commit: ids and timestamps are
+# generated client-side, so committed objects are already complete
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 Base = declarative_base()
 
 
+# Async engine for read endpoints (aiosqlite for SQLite, asyncpg for PostgreSQL)
+def _async_database_url(url: str) -> str:
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+async_connect_args = dict(connect_args)
+if ASYNC_DATABASE_URL.startswith("postgresql+asyncpg://"):
+    async_connect_args.pop("prepare_threshold", None)  # asyncpg caches statements itself
+    if PGBOUNCER:
+        async_connect_args.update(
+            statement_cache_size=0,
+            prepared_statement_cache_size=0,
+            prepared_statement_name_func=lambda: f"__asyncpg_{uuid.uuid4()}__",
+        )
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, connect_args=async_connect_args, echo=False, **engine_kwargs)
+
+if IS_SQLITE:
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
 # =============================================================================
 # MODELS
 # =============================================================================
 
+def utc_now() -> datetime:
+    """
+    Current UTC time as a naive datetime (columns are timezone-naive UTC).
+    Replaces the deprecated datetime.utcnow().
+    """
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _uuid7() -> uuid.UUID:
+    """
+    Time-ordered UUID (RFC 9562 version 7): 48-bit ms timestamp + random bits.
+    New ids sort after older ones, so primary-key inserts land at the tail
+    of the B-tree instead of at random pages.
+    """
+    ts_ms = time.time_ns() // 1_000_000
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ts_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76                          # version
+    value |= ((rand >> 62) & 0xFFF) << 64       # rand_a (12 bits)
+    value |= 0b10 << 62                         # variant
+    value |= rand & 0x3FFF_FFFF_FFFF_FFFF       # rand_b (62 bits)
+    return uuid.UUID(int=value)
+
+
 def generate_uuid():
-    return str(uuid.uuid4())
+    return str(_uuid7())
 
 
 
@@ -66,7 +158,7 @@ class AppConfig(Base):
     
     key = Column(String, primary_key=True)
     value = Column(String)  # JSON encoded value or simple string
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
 
 
 # =============================================================================
@@ -82,7 +174,7 @@ class User(Base):
     password_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
     role = Column(String, default="doctor")  # doctor, nurse, admin
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utc_now)
     
     # Relationships
     patients = relationship("Patient", back_populates="created_by_user")
@@ -100,9 +192,9 @@ class Patient(Base):
     location = Column(String)  # Ward, Room
     current_risk_score = Column(Float, default=0.0)
     current_risk_level = Column(String, default="low")
-    created_by = Column(String, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_by = Column(String, ForeignKey("users.id"), index=True)
+    created_at = Column(DateTime, default=utc_now)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
     
     # Relationships
     created_by_user = relationship("User", back_populates="patients")
@@ -113,23 +205,42 @@ class Patient(Base):
     clinical_notes = relationship("ClinicalNote", back_populates="patient", cascade="all, delete-orphan")
 
 
+# Patient list is ordered (and keyset-paginated) by risk, highest first
+Index("ix_patients_risk_desc", Patient.current_risk_score.desc(), Patient.id)
+
+
 class Vital(Base):
     """Vital signs - blood sugar, blood pressure, etc."""
     __tablename__ = "vitals"
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    patient_id = Column(String, ForeignKey("patients.id"), nullable=False, index=True)
+    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
     vital_type = Column(String, nullable=False)  # blood_sugar, blood_pressure, heart_rate, etc.
     value = Column(Float, nullable=False)
     value2 = Column(Float)  # For BP diastolic
     unit = Column(String)  # mg/dL, mmHg, bpm
-    recorded_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    recorded_at = Column(DateTime, default=utc_now)
+    created_at = Column(DateTime, default=utc_now)
     
     # Relationships
     patient = relationship("Patient", back_populates="vitals")
 
 
+# Vital types are stored snake_case; legacy camelCase names are mapped on write
+VITAL_TYPE_CANON = {
+    "heartRate": "heart_rate",
+    "bloodPressure": "blood_pressure",
+    "oxygenSat": "oxygen_sat",
+    "respiratoryRate": "respiratory_rate",
+}
+
+
+# Latest-reading-per-type lookups (risk scoring) filter on patient + type, newest first
+Index("ix_vitals_patient_type_time", Vital.patient_id, Vital.vital_type, Vital.recorded_at.desc())
+# Per-patient history endpoints: WHERE patient_id = ? ORDER BY recorded_at DESC LIMIT n
+Index("ix_vitals_patient_time", Vital.patient_id, Vital.recorded_at.desc())
+
+
 class RiskScore(Base):
     """Computed risk scores history"""
     __tablename__ = "risk_scores"
@@ -141,12 +252,15 @@ class RiskScore(Base):
     model_used = Column(String)  # diabetes, cardiac, general
     confidence = Column(Float)
     routing_reason = Column(String)
-    computed_at = Column(DateTime, default=datetime.utcnow)
+    computed_at = Column(DateTime, default=utc_now)
     
     # Relationships
     patient = relationship("Patient", back_populates="risk_scores")
 
 
+Index("ix_risk_scores_patient_time", RiskScore.patient_id, RiskScore.computed_at.desc())
+
+
 class Alert(Base):
     """Risk alerts - replaces mockAlerts.ts"""
     __tablename__ = "alerts"
@@ -159,8 +273,8 @@ class Alert(Base):
     status = Column(String, default="active")  # active, acknowledged, dismissed
     acknowledged_by = Column(String, ForeignKey("users.id"))
     acknowledged_at = Column(DateTime)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, default=utc_now)
+    updated_at = Column(DateTime, default=utc_now, onupdate=utc_now)
     
     # NEW: For auto-generated alerts with risk snapshots
     risk_snapshot = Column(Text)  # JSON: stores features + explanation at alert time
@@ -171,37 +285,58 @@ class Alert(Base):
     patient = relationship("Patient", back_populates="alerts")
 
 
+# Alert list filters by status, newest first
+Index("ix_alerts_status_time", Alert.status, Alert.created_at.desc())
+Index("ix_alerts_patient_time", Alert.patient_id, Alert.created_at.desc())
+
+# At most one active auto-generated alert per patient; risk scoring upserts
+# against this index (ON CONFLICT) instead of probing for an existing alert.
+# Literals, not bound parameters, so Postgres can match the partial index.
+ACTIVE_AUTO_ALERT = and_(Alert.status == literal_column("'active'"), Alert.auto_generated == true())
+Index(
+    "ix_alerts_one_active_auto", Alert.patient_id, unique=True,
+    postgresql_where=ACTIVE_AUTO_ALERT, sqlite_where=ACTIVE_AUTO_ALERT,
+)
+
+
 class Lab(Base):
     """Lab results - glucose, creatinine, etc."""
     __tablename__ = "labs"
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    patient_id = Column(String, ForeignKey("patients.id"), nullable=False, index=True)
+    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
     lab_type = Column(String, nullable=False)  # glucose, creatinine, lactate, cholesterol, etc.
     value = Column(Float, nullable=False)
     unit = Column(String)  # mg/dL, mmol/L
-    recorded_at = Column(DateTime, default=datetime.utcnow)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    recorded_at = Column(DateTime, default=utc_now)
+    created_at = Column(DateTime, default=utc_now)
     
     # Relationships
     patient = relationship("Patient", back_populates="labs")
 
 
+Index("ix_labs_patient_type_time", Lab.patient_id, Lab.lab_type, Lab.recorded_at.desc())
+Index("ix_labs_patient_time", Lab.patient_id, Lab.recorded_at.desc())
+
+
 class ClinicalNote(Base):
     """Clinical notes - doctor observations, consultation notes"""
     __tablename__ = "clinical_notes"
     
     id = Column(String, primary_key=True, default=generate_uuid)
-    patient_id = Column(String, ForeignKey("patients.id"), nullable=False, index=True)
+    patient_id = Column(String, ForeignKey("patients.id", ondelete="CASCADE"), nullable=False, index=True)
     note_type = Column(String, default="observation")  # observation, consultation, procedure, medication
     content = Column(Text, nullable=False)
     created_by = Column(String, ForeignKey("users.id"))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=utc_now)
     
     # Relationships
     patient = relationship("Patient", back_populates="clinical_notes")
 
 
+Index("ix_clinical_notes_patient_time", ClinicalNote.patient_id, ClinicalNote.created_at.desc())
+
+
 # =============================================================================
 # DATABASE FUNCTIONS
 # =============================================================================
@@ -215,10 +350,16 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """Get async database session - use with FastAPI Depends() in async routes"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """Initialize database tables"""
     # Ensure data directory exists for SQLite
-    if DATABASE_URL.startswith("sqlite"):
+    if IS_SQLITE:
         Path("./data").mkdir(exist_ok=True)
     
     Base.metadata.create_all(bind=engine)
@@ -227,7 +368,7 @@ def init_db():
 
 def seed_demo_data():
     """Seed database with demo data for testing"""
-    from hashlib import sha256
+    from .auth import hash_password
     
     db = SessionLocal()
     try:
@@ -241,26 +382,25 @@ def seed_demo_data():
             User(
                 id="user-1",
                 email="doctor1@hospital",
-                password_hash=sha256("password".encode()).hexdigest(),
+                password_hash=hash_password("password"),
                 name="Dr. Sarah Chen",
                 role="doctor"
             ),
             User(
                 id="user-2", 
                 email="nurse1@hospital",
-                password_hash=sha256("password".encode()).hexdigest(),
+                password_hash=hash_password("password"),
                 name="Nurse Michael Johnson",
                 role="nurse"
             ),
             User(
                 id="user-3",
                 email="admin@hospital",
-                password_hash=sha256("adminpass".encode()).hexdigest(),
+                password_hash=hash_password("adminpass"),
                 name="Admin User",
                 role="admin"
             ),
         ]
-        db.add_all(users)
         
         # Create demo patients
         patients = [
@@ -295,7 +435,6 @@ def seed_demo_data():
                 created_by="user-1"
             ),
         ]
-        db.add_all(patients)
         
         # Create demo vitals
         vitals = [
@@ -304,7 +443,6 @@ def seed_demo_data():
             Vital(patient_id="patient-2", vital_type="blood_sugar", value=118, unit="mg/dL"),
             Vital(patient_id="patient-3", vital_type="blood_sugar", value=185, unit="mg/dL"),
         ]
-        db.add_all(vitals)
         
         # Create demo alerts
         alerts = [
@@ -323,8 +461,9 @@ def seed_demo_data():
                 status="active"
             ),
         ]
-        db.add_all(alerts)
         
+        # Single bulk insert in FK order (users -> patients -> vitals/alerts)
+        db.bulk_save_objects(users + patients + vitals + alerts)
         db.commit()
         print("✓ Demo data seeded successfully")
         
@@ -335,6 +474,69 @@ def seed_demo_data():
         db.close()
 
 
+def import_timelines(timeline_dir: Path) -> int:
+    """
+    One-time ingest of synthetic timeline JSON files into the Patient,
+    Vital and ClinicalNote tables. Patients that already exist are skipped.
+    Returns the number of patients imported.
+    """
+    import json
+    
+    db = SessionLocal()
+    try:
+        existing = {pid for (pid,) in db.query(Patient.id).all()}
+        records = []
+        imported = 0
+        
+        for path in sorted(Path(timeline_dir).glob("*.json")):
+            data = json.loads(path.read_bytes())
+            patient_id = data.get("patient_id", path.stem)
+            if patient_id in existing:
+                continue
+            
+            demographics = data.get("demographics", {})
+            timeline = data.get("timeline", {})
+            records.append(Patient(
+                id=patient_id,
+                name=f"Patient {patient_id.split('_')[-1]}",
+                age=demographics.get("age"),
+                sex=demographics.get("sex"),
+            ))
+            for r in timeline.get("blood_sugar", []):
+                records.append(Vital(
+                    patient_id=patient_id, vital_type="blood_sugar", value=r["value"],
+                    unit="mg/dL", recorded_at=datetime.strptime(r["date"], "%Y-%m-%d"),
+                ))
+            for r in timeline.get("blood_pressure", []):
+                records.append(Vital(
+                    patient_id=patient_id, vital_type="blood_pressure", value=r["systolic"],
+                    value2=r.get("diastolic"), unit="mmHg",
+                    recorded_at=datetime.strptime(r["date"], "%Y-%m-%d"),
+                ))
+            for r in timeline.get("notes", []):
+                records.append(ClinicalNote(
+                    patient_id=patient_id, note_type="observation", content=r["text"],
+                    created_at=datetime.strptime(r["date"], "%Y-%m-%d"),
+                ))
+            for r in timeline.get("medications", []):
+                records.append(ClinicalNote(
+                    patient_id=patient_id, note_type="medication", content=r["name"],
+                    created_at=datetime.strptime(r["date"], "%Y-%m-%d"),
+                ))
+            imported += 1
+        
+        db.add_all(records)
+        db.commit()
+        print(f"✓ Imported {imported} patient timelines from {timeline_dir}")
+        return imported
+    except Exception as e:
+        db.rollback()
+        print(f"✗ Error importing timelines: {e}")
+        return 0
+    finally:
+        db.close()
+
+
 # =============================================================================
 # CLI
 # =============================================================================
@@ -349,7 +551,13 @@ if __name__ == "__main__":
         if "--seed" in sys.argv:
             print("Seeding demo data...")
             seed_demo_data()
+    elif "--import-timelines" in sys.argv:
+        idx = sys.argv.index("--import-timelines")
+        timeline_dir = sys.argv[idx + 1] if len(sys.argv) > idx + 1 else "./data/synthetic/timelines"
+        init_db()
+        import_timelines(Path(timeline_dir))
     else:
         print("Usage:")
         print("  python -m backend.database --init        # Create tables")
         print("  python -m backend.database --init --seed # Create tables + demo data")
+        print("  python -m backend.database --import-timelines [dir]  # Load synthetic timelines")
@@ -14,16 +14,33 @@ Usage:
     uvicorn backend.main:app --reload --port 8000
 """
 
+import os
 import json
+import queue
+import atexit
+import asyncio
+import logging
 import pickle
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
-from datetime import datetime
+from datetime import datetime, date
 
+import numpy as np
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 # Import our engines
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
@@ -49,6 +66,27 @@ PROJECT_ROOT = Path(__file__).parent.parent
 DATA_DIR = PROJECT_ROOT / "data" / "synthetic"
 MODELS_DIR = PROJECT_ROOT / "models"
 
+# Where /alerts and /patients/{id}/risk read timelines from:
+# "files" (JSON under DATA_DIR) or "db" (after `python -m backend.database --import-timelines`)
+TIMELINE_SOURCE = os.getenv("TIMELINE_SOURCE", "files")
+
+# Worker processes for CPU-bound risk scoring (0 = score in-process on a thread)
+SCORING_WORKERS = int(os.getenv("SCORING_WORKERS", "0"))
+
+# Backend loggers hand records to a queue; a listener thread does the stream
+# I/O so request handlers never block on it
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_log_listener = QueueListener(_log_queue, _log_stream)
+_backend_logger = logging.getLogger("backend")
+_backend_logger.setLevel(LOG_LEVEL)
+_backend_logger.addHandler(QueueHandler(_log_queue))
+_backend_logger.propagate = False
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 # =============================================================================
 # PYDANTIC MODELS
 # =============================================================================
@@ -109,18 +147,28 @@ class EventInput(BaseModel):
 app = FastAPI(
     title="Clinical Intelligence Platform API",
     description="Longitudinal patient risk monitoring system",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=ORJSONResponse,
 )
 
-# CORS for frontend
+# CORS for frontend - explicit origins only; browsers reject "*" with credentials
+CORS_ORIGINS = [
+    o.strip()
+    for o in os.getenv("CORS_ORIGINS", "http://localhost:5173,http://localhost:3000").split(",")
+    if o.strip()
+]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000", "*"],
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# Compress large JSON payloads (timelines, alert lists)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Include database routes
 try:
     from .routes import router as db_router
@@ -136,26 +184,112 @@ except Exception as e:
 # DATA LAYER
 # =============================================================================
 
+@lru_cache(maxsize=2048)
+def _load_patient_cached(patient_file: str, mtime_ns: int) -> Dict:
+    """Parse a timeline file. mtime_ns is part of the cache key so edits invalidate it."""
+    with open(patient_file, 'rb') as f:
+        return _json_loads(f.read())
+
+
 def load_patient(patient_id: str) -> Optional[Dict]:
     """Load patient timeline from JSON file."""
     timeline_dir = DATA_DIR / "timelines"
     patient_file = timeline_dir / f"{patient_id}.json"
     
-    if not patient_file.exists():
+    try:
+        mtime_ns = patient_file.stat().st_mtime_ns
+    except OSError:
         return None
     
-    with open(patient_file) as f:
-        return json.load(f)
+    return _load_patient_cached(str(patient_file), mtime_ns)
+
+
+_patient_list_cache: Dict[str, Any] = {"mtime_ns": None, "ids": []}
 
 
 def list_patients() -> List[str]:
-    """List all patient IDs."""
+    """List all patient IDs (cached until the timelines directory changes)."""
     timeline_dir = DATA_DIR / "timelines"
-    if not timeline_dir.exists():
+    try:
+        mtime_ns = timeline_dir.stat().st_mtime_ns
+    except OSError:
         return []
-    return [f.stem for f in timeline_dir.glob("*.json")]
+    
+    if _patient_list_cache["mtime_ns"] != mtime_ns:
+        with os.scandir(timeline_dir) as entries:
+            ids = [e.name[:-5] for e in entries if e.name.endswith(".json") and e.is_file()]
+        _patient_list_cache["ids"] = ids
+        _patient_list_cache["mtime_ns"] = mtime_ns
+    return list(_patient_list_cache["ids"])
+
+
+def load_patients_from_db(patient_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+    """
+    Rebuild timeline dicts from the Vital and ClinicalNote tables.
+    Uses one ordered query per table instead of one file read per patient.
+    """
+    from .database import SessionLocal, Patient, Vital, ClinicalNote
+    
+    db = SessionLocal()
+    try:
+        patient_q = db.query(Patient.id, Patient.age, Patient.sex)
+        vital_q = db.query(Vital.patient_id, Vital.vital_type, Vital.value, Vital.value2, Vital.recorded_at).filter(
+            Vital.vital_type.in_(["blood_sugar", "blood_pressure"])
+        )
+        note_q = db.query(ClinicalNote.patient_id, ClinicalNote.note_type, ClinicalNote.content, ClinicalNote.created_at)
+        if patient_ids is not None:
+            patient_q = patient_q.filter(Patient.id.in_(patient_ids))
+            vital_q = vital_q.filter(Vital.patient_id.in_(patient_ids))
+            note_q = note_q.filter(ClinicalNote.patient_id.in_(patient_ids))
+        
+        patients = {}
+        for pid, age, sex in patient_q.all():
+            patients[pid] = {
+                "patient_id": pid,
+                "demographics": {"age": age or 0, "sex": sex},
+                "timeline": {"blood_sugar": [], "blood_pressure": [], "notes": [], "medications": []},
+            }
+        
+        for pid, vital_type, value, value2, recorded_at in vital_q.order_by(Vital.recorded_at.asc()).all():
+            if pid not in patients:
+                continue
+            date_str = recorded_at.strftime("%Y-%m-%d")
+            if vital_type == "blood_sugar":
+                patients[pid]["timeline"]["blood_sugar"].append({"date": date_str, "value": value})
+            else:
+                patients[pid]["timeline"]["blood_pressure"].append(
+                    {"date": date_str, "systolic": value, "diastolic": value2}
+                )
+        
+        for pid, note_type, content, created_at in note_q.order_by(ClinicalNote.created_at.asc()).all():
+            if pid not in patients:
+                continue
+            date_str = created_at.strftime("%Y-%m-%d")
+            if note_type == "medication":
+                patients[pid]["timeline"]["medications"].append({"date": date_str, "name": content})
+            else:
+                patients[pid]["timeline"]["notes"].append({"date": date_str, "text": content})
+        
+        return patients
+    finally:
+        db.close()
+
+
+def _load_artifact(path: Path):
+    """
+    Load a pickled model artifact. Uses joblib with mmap_mode so arrays in
+    joblib-dumped files are memory-mapped and shared between workers;
+    plain pickles load normally.
+    """
+    try:
+        import joblib
+        return joblib.load(path, mmap_mode="r")
+    except ImportError:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
 
 
+@lru_cache(maxsize=1)
 def load_model():
     """Load the trained risk scoring model (fallback)."""
     model_path = MODELS_DIR / "real_data_model.pkl"
@@ -166,13 +300,11 @@ def load_model():
     if not model_path.exists():
         return None, None
     
-    with open(model_path, 'rb') as f:
-        model = pickle.load(f)
+    model = _load_artifact(model_path)
     
     scaler = None
     if scaler_path.exists():
-        with open(scaler_path, 'rb') as f:
-            scaler = pickle.load(f)
+        scaler = _load_artifact(scaler_path)
     
     return model, scaler
 
@@ -187,6 +319,14 @@ EXPLANATION_ENGINE = ExplanationEngine(feature_importance=FEATURE_IMPORTANCE)
 # TREND EXTRACTION (Model 1 - NO ML)
 # =============================================================================
 
+@lru_cache(maxsize=8192)
+def _date_ordinal(date_str: str) -> int:
+    """Parse a YYYY-MM-DD string to a day ordinal. Timelines reuse dates heavily."""
+    if len(date_str) == 10 and date_str[4] == "-" and date_str[7] == "-":
+        return date(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10])).toordinal()
+    return datetime.strptime(date_str, "%Y-%m-%d").toordinal()
+
+
 def extract_trends(patient_data: Dict) -> Dict[str, Any]:
     """
     Extract trend features from patient timeline.
@@ -212,9 +352,9 @@ def extract_trends(patient_data: Dict) -> Dict[str, Any]:
         
         # Duration
         try:
-            first_date = datetime.strptime(blood_sugar[0]["date"], "%Y-%m-%d")
-            last_date = datetime.strptime(blood_sugar[-1]["date"], "%Y-%m-%d")
-            features["trend_duration_months"] = round((last_date - first_date).days / 30)
+            first_day = _date_ordinal(blood_sugar[0]["date"])
+            last_day = _date_ordinal(blood_sugar[-1]["date"])
+            features["trend_duration_months"] = round((last_day - first_day) / 30)
         except:
             features["trend_duration_months"] = 0
     
@@ -231,9 +371,9 @@ def extract_trends(patient_data: Dict) -> Dict[str, Any]:
     medications = timeline.get("medications", [])
     if medications and blood_sugar:
         try:
-            med_date = datetime.strptime(medications[0]["date"], "%Y-%m-%d")
-            first_date = datetime.strptime(blood_sugar[0]["date"], "%Y-%m-%d")
-            months_to_med = (med_date - first_date).days / 30
+            med_day = _date_ordinal(medications[0]["date"])
+            first_day = _date_ordinal(blood_sugar[0]["date"])
+            months_to_med = (med_day - first_day) / 30
             features["medication_delay"] = 1 if months_to_med > 12 else 0
         except:
             features["medication_delay"] = 0
@@ -243,10 +383,172 @@ def extract_trends(patient_data: Dict) -> Dict[str, Any]:
     return features
 
 
+def extract_trends_batch(patients: List[Dict]) -> List[Dict[str, Any]]:
+    """
+    Vectorized extract_trends over many patients at once.
+    Readings are flattened into long-format DataFrames and reduced with a
+    groupby, so the per-patient math runs as column operations.
+    Produces the same features as calling extract_trends per patient.
+    """
+    import pandas as pd
+    
+    timelines = [p.get("timeline", {}) for p in patients]
+    results = []
+    for p in patients:
+        demographics = p.get("demographics", {})
+        results.append({
+            "age": demographics.get("age", 0),
+            "sex": 1 if demographics.get("sex") == "M" else 0,
+        })
+    
+    # Blood sugar trends
+    sugar = pd.DataFrame.from_records(
+        [(i, r.get("date"), r.get("value"))
+         for i, t in enumerate(timelines) for r in t.get("blood_sugar", [])],
+        columns=["idx", "date", "value"],
+    )
+    if not sugar.empty:
+        agg = sugar.groupby("idx", sort=False).agg(
+            first=("value", "first"),
+            last=("value", "last"),
+            first_date=("date", "first"),
+            last_date=("date", "last"),
+            count=("value", "size"),
+        )
+        agg = agg[agg["count"] >= 2]
+        pct = (agg["last"] - agg["first"]) / agg["first"] * 100
+        first_dates = pd.to_datetime(agg["first_date"], format="%Y-%m-%d", errors="coerce")
+        last_dates = pd.to_datetime(agg["last_date"], format="%Y-%m-%d", errors="coerce")
+        months = ((last_dates - first_dates).dt.days / 30).fillna(0)
+        
+        for idx, first, last, change, duration in zip(
+            agg.index.tolist(), agg["first"].tolist(), agg["last"].tolist(),
+            pct.tolist(), months.tolist(),
+        ):
+            features = results[idx]
+            features["sugar_percent_change"] = round(change, 1)
+            features["sugar_trend_up"] = 1 if last > first else 0
+            features["sugar_first"] = first
+            features["sugar_last"] = last
+            features["trend_duration_months"] = round(duration)
+    
+    # Blood pressure trends
+    bp = pd.DataFrame.from_records(
+        [(i, r.get("systolic", 0))
+         for i, t in enumerate(timelines) for r in t.get("blood_pressure", [])],
+        columns=["idx", "systolic"],
+    )
+    if not bp.empty:
+        agg = bp.groupby("idx", sort=False).agg(
+            first=("systolic", "first"),
+            last=("systolic", "last"),
+            count=("systolic", "size"),
+        )
+        agg = agg[(agg["count"] >= 2) & (agg["first"] > 0)]
+        pct = (agg["last"] - agg["first"]) / agg["first"] * 100
+        
+        for idx, first, last, change in zip(
+            agg.index.tolist(), agg["first"].tolist(), agg["last"].tolist(), pct.tolist(),
+        ):
+            results[idx]["bp_percent_change"] = round(change, 1)
+            results[idx]["bp_trend_up"] = 1 if last > first else 0
+    
+    # Medication delay
+    for features in results:
+        features["medication_delay"] = 0
+    med = pd.DataFrame.from_records(
+        [(i, t["medications"][0].get("date"), t["blood_sugar"][0].get("date"))
+         for i, t in enumerate(timelines) if t.get("medications") and t.get("blood_sugar")],
+        columns=["idx", "med_date", "first_date"],
+    )
+    if not med.empty:
+        med_dates = pd.to_datetime(med["med_date"], format="%Y-%m-%d", errors="coerce")
+        first_dates = pd.to_datetime(med["first_date"], format="%Y-%m-%d", errors="coerce")
+        delayed = (med_dates - first_dates).dt.days / 30 > 12
+        for idx in med.loc[delayed, "idx"].tolist():
+            results[idx]["medication_delay"] = 1
+    
+    return results
+
+
 # =============================================================================
 # RISK SCORING (Model 2 - ML via Service)
 # =============================================================================
 
+# Basic 8 features used by the fallback model
+FEATURE_ORDER = ("age", "sex", "sugar_percent_change", "sugar_trend_up",
+                 "trend_duration_months", "bp_percent_change", "bp_trend_up",
+                 "medication_delay")
+
+
+def _build_feature_matrix(features_list: List[Dict[str, Any]]) -> np.ndarray:
+    """Stack feature dicts into an (N, len(FEATURE_ORDER)) float matrix."""
+    n_features = len(FEATURE_ORDER)
+    X = np.fromiter(
+        (f.get(k, 0) or 0 for f in features_list for k in FEATURE_ORDER),
+        dtype=np.float64,
+        count=len(features_list) * n_features,
+    )
+    return X.reshape(len(features_list), n_features)
+
+
+def _specialize_linear_model(model, scaler):
+    """
+    Extract (mean, scale, weights, bias) from a binary linear model and
+    standard scaler so inference can skip sklearn's per-call validation.
+    Returns None if the model doesn't fit that shape.
+    """
+    coef = getattr(model, "coef_", None)
+    intercept = getattr(model, "intercept_", None)
+    if coef is None or intercept is None or coef.shape != (1, len(FEATURE_ORDER)):
+        return None
+    
+    if scaler is None:
+        mu, sigma = np.zeros(len(FEATURE_ORDER)), np.ones(len(FEATURE_ORDER))
+    elif hasattr(scaler, "mean_") and hasattr(scaler, "scale_"):
+        mu = np.asarray(scaler.mean_, dtype=np.float64)
+        sigma = np.asarray(scaler.scale_, dtype=np.float64)
+    else:
+        return None
+    
+    return mu, sigma, np.asarray(coef[0], dtype=np.float64), float(intercept[0])
+
+
+LINEAR_PARAMS = _specialize_linear_model(MODEL, SCALER) if MODEL is not None else None
+
+
+def _feature_row(features: Dict[str, Any]) -> np.ndarray:
+    """
+    Build a single (1, len(FEATURE_ORDER)) row for one patient.
+    Allocated per call rather than reusing a module buffer, since sync
+    endpoints run concurrently in FastAPI's threadpool.
+    """
+    return np.array([[features.get(k, 0) or 0 for k in FEATURE_ORDER]], dtype=np.float64)
+
+
+def _score_batch(X: np.ndarray) -> np.ndarray:
+    """Return positive-class probabilities for a feature matrix from the fallback model."""
+    if LINEAR_PARAMS is not None:
+        mu, sigma, w, b = LINEAR_PARAMS
+        z = ((X - mu) / sigma) @ w + b
+        return 1.0 / (1.0 + np.exp(-z))
+    
+    if SCALER:
+        X = SCALER.transform(X)
+    return MODEL.predict_proba(X)[:, 1]
+
+
+def _risk_results(probs: np.ndarray) -> List[Dict[str, Any]]:
+    """Convert probabilities into risk result dicts."""
+    levels = np.where(probs >= 0.7, "HIGH", np.where(probs >= 0.4, "MEDIUM", "LOW"))
+    scores = np.round(probs, 2).tolist()
+    confidences = np.round(np.maximum(probs, 1 - probs), 2).tolist()
+    return [
+        {"risk_score": score, "risk_level": level, "confidence": confidence}
+        for score, level, confidence in zip(scores, levels.tolist(), confidences)
+    ]
+
+
 def score_risk(features: Dict[str, Any]) -> Dict[str, Any]:
     """
     Score patient risk using trained model.
@@ -264,34 +566,66 @@ def score_risk(features: Dict[str, Any]) -> Dict[str, Any]:
         }
     
     # Fallback to direct model (only if router not available)
+    return score_risk_vec(_feature_row(features))
+
+
+def score_risk_vec(vec: np.ndarray) -> Dict[str, Any]:
+    """
+    Score one patient from a feature vector already laid out in FEATURE_ORDER,
+    skipping the dict lookups. The Model Service routes on named features, so
+    it still receives a dict.
+    """
+    if USE_SERVICE and MODEL_SERVICE:
+        return score_risk(dict(zip(FEATURE_ORDER, np.ravel(vec).tolist())))
+    
     if MODEL is None:
         return {"risk_score": 0.5, "risk_level": "UNKNOWN", "confidence": 0}
     
-    # Use basic 8 features for fallback
-    feature_order = ["age", "sex", "sugar_percent_change", "sugar_trend_up",
-                     "trend_duration_months", "bp_percent_change", "bp_trend_up",
-                     "medication_delay"]
-    
-    import pandas as pd
-    X = pd.DataFrame([{k: features.get(k, 0) for k in feature_order}])
-    
-    if SCALER:
-        X = SCALER.transform(X)
-    
-    prob = MODEL.predict_proba(X)[0, 1]
-    
-    if prob >= 0.7:
-        level = "HIGH"
-    elif prob >= 0.4:
-        level = "MEDIUM"
-    else:
-        level = "LOW"
+    return _risk_results(_score_batch(np.asarray(vec, dtype=np.float64).reshape(1, len(FEATURE_ORDER))))[0]
+
+
+def score_risk_batch(features_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score many patients at once.
+    The fallback model is called once on the stacked feature rows; the
+    Model Service path still routes each patient individually.
+    """
+    if (USE_SERVICE and MODEL_SERVICE) or MODEL is None or not features_list:
+        return [score_risk(f) for f in features_list]
     
-    return {
-        "risk_score": round(float(prob), 2),
-        "risk_level": level,
-        "confidence": round(float(max(prob, 1 - prob)), 2)
-    }
+    return _risk_results(_score_batch(_build_feature_matrix(features_list)))
+
+
+_SCORING_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def _warm_scoring_worker():
+    """Load the model once per worker process."""
+    load_model()
+
+
+def _scoring_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared scoring pool, created on first use when SCORING_WORKERS > 0."""
+    global _SCORING_POOL
+    if _SCORING_POOL is None and SCORING_WORKERS > 0:
+        _SCORING_POOL = ProcessPoolExecutor(max_workers=SCORING_WORKERS, initializer=_warm_scoring_worker)
+    return _SCORING_POOL
+
+
+def score_risk_pooled(features: Dict[str, Any]) -> Dict[str, Any]:
+    """score_risk for sync callers; runs in the scoring pool when one is configured."""
+    pool = _scoring_pool()
+    if pool is None:
+        return score_risk(features)
+    return pool.submit(score_risk, features).result()
+
+
+async def score_risk_async(features: Dict[str, Any]) -> Dict[str, Any]:
+    """score_risk without blocking the event loop."""
+    pool = _scoring_pool()
+    if pool is None:
+        return await asyncio.to_thread(score_risk, features)
+    return await asyncio.get_running_loop().run_in_executor(pool, score_risk, features)
 
 
 # =============================================================================
@@ -340,7 +674,7 @@ def get_patient_trends(patient_id: str):
 
 
 @app.get("/patients/{patient_id}/risk")
-def get_patient_risk(patient_id: str):
+async def get_patient_risk(patient_id: str):
     """
     Get risk score and explanation for a patient.
     This is the main endpoint combining all 3 models:
@@ -348,7 +682,10 @@ def get_patient_risk(patient_id: str):
     2. Risk Scorer
     3. Explanation Generator
     """
-    patient = load_patient(patient_id)
+    if TIMELINE_SOURCE == "db":
+        patient = (await asyncio.to_thread(load_patients_from_db, [patient_id])).get(patient_id)
+    else:
+        patient = await asyncio.to_thread(load_patient, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
     
@@ -356,7 +693,7 @@ def get_patient_risk(patient_id: str):
     trends = extract_trends(patient)
     
     # Model 2: Score risk
-    risk = score_risk(trends)
+    risk = await score_risk_async(trends)
     
     # Model 3: Generate explanation
     explanation = EXPLANATION_ENGINE.explain(trends, risk)
@@ -377,25 +714,19 @@ def get_patient_risk(patient_id: str):
     }
 
 
-@app.get("/alerts")
-def get_alerts():
-    """Get all active risk alerts (patients with HIGH risk)."""
-    alerts = []
+def _build_alerts(loaded: List[tuple]) -> List[Dict[str, Any]]:
+    """Score (patient_id, timeline) pairs in one batch and build alert dicts."""
+    all_trends = extract_trends_batch([patient for _, patient in loaded])
+    all_risks = score_risk_batch(all_trends)
     
-    for patient_id in list_patients():
-        patient = load_patient(patient_id)
-        if not patient:
-            continue
-        
-        trends = extract_trends(patient)
-        risk = score_risk(trends)
-        
+    alerts = []
+    for (patient_id, patient), trends, risk in zip(loaded, all_trends, all_risks):
         if risk["risk_level"] in ["HIGH", "MEDIUM"]:
             explanation = EXPLANATION_ENGINE.explain(trends, risk)
             alerts.append({
                 "id": f"alert-{patient_id}",
                 "patient_id": patient_id,
-                "patient_name": f"Patient {patient_id.split('_')[1]}",
+                "patient_name": f"Patient {patient_id.split('_')[-1]}",
                 "severity": "critical" if risk["risk_level"] == "HIGH" else "medium",
                 "risk_score": risk["risk_score"],
                 "title": f"{risk['risk_level']} Risk - Deterioration Detected",
@@ -407,6 +738,21 @@ def get_alerts():
                 "status": "active",
                 "time": datetime.now().isoformat(),
             })
+    return alerts
+
+
+@app.get("/alerts")
+async def get_alerts():
+    """Get all active risk alerts (patients with HIGH risk)."""
+    if TIMELINE_SOURCE == "db":
+        loaded = list((await asyncio.to_thread(load_patients_from_db)).items())
+    else:
+        patient_ids = list_patients()
+        timelines = await asyncio.gather(*(asyncio.to_thread(load_patient, pid) for pid in patient_ids))
+        loaded = [(pid, patient) for pid, patient in zip(patient_ids, timelines) if patient]
+    
+    # Scoring is CPU-bound; keep it off the event loop
+    alerts = await asyncio.to_thread(_build_alerts, loaded)
     
     # Sort by risk score
     alerts.sort(key=lambda x: x["risk_score"], reverse=True)
@@ -414,10 +760,10 @@ def get_alerts():
 
 
 @app.post("/score")
-def score_features(features: TrendFeatures):
+async def score_features(features: TrendFeatures):
     """Score risk from trend features directly."""
     feature_dict = features.model_dump()
-    risk = score_risk(feature_dict)
+    risk = await score_risk_async(feature_dict)
     explanation = EXPLANATION_ENGINE.explain(feature_dict, risk)
     
     return {
@@ -435,4 +781,7 @@ if __name__ == "__main__":
     print("🏥 Starting Clinical Intelligence Platform API...")
     print(f"   Model loaded: {MODEL is not None}")
     print(f"   Patients: {len(list_patients())}")
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One process per worker; each imports the app and loads its own model
+    workers = int(os.getenv("WEB_CONCURRENCY", (os.cpu_count() or 1) * 2 + 1))
+    print(f"   Workers: {workers}")
+    uvicorn.run("backend.main:app", host="0.0.0.0", port=8000, workers=workers)
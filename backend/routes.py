@@ -5,23 +5,101 @@ CRUD operations for users, patients, vitals, and alerts.
 """
 
 from typing import List, Optional
-from datetime import datetime, timedelta
-from hashlib import sha256
+from datetime import datetime
+from types import MappingProxyType
+import asyncio
+import hashlib
 import json
-
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+import logging
+import time
+
+import numpy as np
+
+try:
+    import orjson
+    def _json_dumps(obj) -> str:
+        # NON_STR_KEYS: ragged CSV rows carry DictReader's None restkey, which json.dumps renders as "null"
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS).decode()
+except ImportError:
+    _json_dumps = json.dumps
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, insert, update, func, and_, or_, literal, null, union_all
 from sqlalchemy.orm import Session
-from pydantic import BaseModel
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, ConfigDict, TypeAdapter
 
-from .database import get_db, User, Patient, Vital, Alert, RiskScore, Lab, ClinicalNote, AppConfig
+from .database import utc_now, generate_uuid, get_db, get_async_db, SessionLocal, AsyncSessionLocal, User, Patient, Vital, Alert, RiskScore, Lab, ClinicalNote, AppConfig, VITAL_TYPE_CANON, ACTIVE_AUTO_ALERT
 from .utils.importer import ClinicalImporter
-from .auth import verify_token, get_optional_user, require_role, require_admin, require_doctor, require_nurse, TokenData, create_access_token
+from .auth import verify_token, get_optional_user, require_role, require_admin, require_doctor, require_nurse, TokenData, create_access_token, verify_and_update_password
+
+logger = logging.getLogger(__name__)
 
 
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
+async def save_patient_record(db: AsyncSession, record, schema):
+    """
+    Insert a new row that references a patient and return it as `schema`.
+    The patient_id foreign key does the existence check, so a violation is
+    reported as a 404.
+    """
+    db.add(record)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Patient not found")
+    response = schema.model_validate(record)
+    await db.commit()
+    return response
+
+
+def upsert_auto_alert(db: Session, values: dict, refresh: tuple = ()) -> bool:
+    """
+    Create a patient's active auto-generated alert in one statement. If one
+    already exists, its `refresh` columns are overwritten instead (left as is
+    when empty). Backed by ix_alerts_one_active_auto, so concurrent scorers
+    can't create duplicates. Returns True when a new alert was inserted.
+    """
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    now = utc_now()
+    alert_id = generate_uuid()
+    stmt = dialect.insert(Alert).values(
+        id=alert_id, status="active", auto_generated=True, created_at=now, updated_at=now, **values
+    )
+    if refresh:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Alert.patient_id],
+            index_where=ACTIVE_AUTO_ALERT,
+            set_={**{column: stmt.excluded[column] for column in refresh}, "updated_at": now},
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=[Alert.patient_id], index_where=ACTIVE_AUTO_ALERT)
+    return db.execute(stmt.returning(Alert.id)).scalar_one_or_none() == alert_id
+
+
+async def not_modified(request: Request, response: Response, db: AsyncSession, version_query, *key) -> Optional[Response]:
+    """
+    Conditional GET support for polled list endpoints.
+    `version_query` returns one cheap aggregate row (e.g. max(updated_at), count)
+    that changes whenever the listed rows do. Sets the ETag header and returns a
+    304 response when the client already holds the current version.
+    """
+    version = (await db.execute(version_query)).one()
+    etag = '"%s"' % hashlib.blake2b(repr((key, tuple(version))).encode(), digest_size=8).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return None
+
+
 def calculate_risk_velocity(db: Session, patient_id: str) -> tuple:
     """
     TASK-4.1: Calculate risk velocity (rate of change) from risk history.
@@ -34,22 +112,29 @@ def calculate_risk_velocity(db: Session, patient_id: str) -> tuple:
     - improving: daily change < -0.01
     - unknown: insufficient data
     """
-    # Get last 5 risk scores ordered by date
-    recent_scores = db.query(RiskScore).filter(
+    # Last 5 risk scores, reduced in SQL to a single row of endpoints
+    recent = select(RiskScore.risk_score, RiskScore.computed_at).where(
         RiskScore.patient_id == patient_id
-    ).order_by(RiskScore.computed_at.asc()).limit(10).all()
+    ).order_by(RiskScore.computed_at.desc()).limit(5).subquery()
+    whole = {"order_by": recent.c.computed_at, "range_": (None, None)}
+    row = db.execute(
+        select(
+            func.count().over().label("n"),
+            func.first_value(recent.c.risk_score).over(**whole).label("first_score"),
+            func.last_value(recent.c.risk_score).over(**whole).label("last_score"),
+            func.min(recent.c.computed_at).over().label("first_at"),
+            func.max(recent.c.computed_at).over().label("last_at"),
+        ).limit(1)
+    ).first()
     
-    if len(recent_scores) < 2:
+    if row is None or row.n < 2:
         return ("unknown", 0.0)
     
-    # Use last 5 readings
-    recent = recent_scores[-5:] if len(recent_scores) >= 5 else recent_scores
-    
-    first_score = recent[0].risk_score
-    last_score = recent[-1].risk_score
+    first_score = row.first_score
+    last_score = row.last_score
     
     # Calculate time difference in days
-    time_diff = (recent[-1].computed_at - recent[0].computed_at).total_seconds() / 86400  # days
+    time_diff = (row.last_at - row.first_at).total_seconds() / 86400  # days
     
     if time_diff < 0.001:  # Less than ~1.5 minutes
         time_diff = 1  # Assume 1 day to avoid division by zero
@@ -71,6 +156,9 @@ def calculate_risk_velocity(db: Session, patient_id: str) -> tuple:
 # PYDANTIC SCHEMAS
 # =============================================================================
 
+# Response models are read-only views of ORM rows
+ORM_RESPONSE_CONFIG = ConfigDict(from_attributes=True, frozen=True, extra="ignore")
+
 # Auth
 class LoginRequest(BaseModel):
     email: str
@@ -111,8 +199,7 @@ class PatientResponse(BaseModel):
     current_risk_level: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 # Vital
 class VitalCreate(BaseModel):
@@ -132,8 +219,7 @@ class VitalResponse(BaseModel):
     unit: Optional[str]
     recorded_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 # Alert
 class AlertResponse(BaseModel):
@@ -147,8 +233,7 @@ class AlertResponse(BaseModel):
     auto_generated: Optional[bool] = False
     updated_at: Optional[datetime] = None
     
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 # Lab
 class LabCreate(BaseModel):
@@ -166,8 +251,7 @@ class LabResponse(BaseModel):
     unit: Optional[str]
     recorded_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
 
 # Clinical Note
 class ClinicalNoteCreate(BaseModel):
@@ -182,8 +266,66 @@ class ClinicalNoteResponse(BaseModel):
     content: str
     created_at: datetime
     
-    class Config:
-        from_attributes = True
+    model_config = ORM_RESPONSE_CONFIG
+
+
+def response_columns(model, schema: type) -> tuple:
+    """Mapped columns behind each field of a response schema."""
+    return tuple(getattr(model, field) for field in schema.model_fields)
+
+
+# Read-only list endpoints select plain column rows rather than ORM entities:
+# no identity map or attribute instrumentation per row
+PATIENT_COLUMNS = response_columns(Patient, PatientResponse)
+VITAL_COLUMNS = response_columns(Vital, VitalResponse)
+ALERT_COLUMNS = response_columns(Alert, AlertResponse)
+LAB_COLUMNS = response_columns(Lab, LabResponse)
+NOTE_COLUMNS = response_columns(ClinicalNote, ClinicalNoteResponse)
+
+
+# List serializers - validate rows and dump straight to JSON bytes,
+# bypassing FastAPI's response_model encoding for the large list endpoints
+PatientListAdapter = TypeAdapter(List[PatientResponse])
+VitalListAdapter = TypeAdapter(List[VitalResponse])
+AlertListAdapter = TypeAdapter(List[AlertResponse])
+LabListAdapter = TypeAdapter(List[LabResponse])
+NoteListAdapter = TypeAdapter(List[ClinicalNoteResponse])
+
+
+def json_list(adapter: TypeAdapter, rows, response: Optional[Response] = None) -> Response:
+    """Serialize rows with a list TypeAdapter, keeping headers set on `response`."""
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+        media_type="application/json",
+        headers=dict(response.headers) if response is not None else None,
+    )
+
+
+# Per-patient history endpoints page newest-first with `limit` + `before`
+HISTORY_PAGE_SIZE = 100
+HISTORY_MAX_PAGE_SIZE = 1000
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+STREAM_BATCH_SIZE = 500
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True when the client asked for newline-delimited JSON."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_stream(query, model: type) -> StreamingResponse:
+    """
+    Stream rows as newline-delimited JSON from a server-side cursor,
+    STREAM_BATCH_SIZE rows at a time. Opens its own session because the
+    body is produced after the request's DB dependency has been released.
+    """
+    async def rows():
+        async with AsyncSessionLocal() as session:
+            result = await session.stream(query.execution_options(yield_per=STREAM_BATCH_SIZE))
+            async for row in result:
+                yield model.model_validate(row).model_dump_json().encode() + b"\n"
+    return StreamingResponse(rows(), media_type=NDJSON_MEDIA_TYPE)
 
 
 # =============================================================================
@@ -198,21 +340,27 @@ router = APIRouter()
 # -----------------------------------------------------------------------------
 
 @router.post("/auth/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """Authenticate user and return JWT token."""
-    password_hash = sha256(request.password.encode()).hexdigest()
-    
-    user = db.query(User).filter(
-        User.email == request.email,
-        User.password_hash == password_hash
-    ).first()
+    result = await db.execute(select(User).where(User.email == request.email))
+    user = result.scalars().first()
     
-    if not user:
+    # Password hashing is CPU-bound; keep it off the event loop
+    valid, new_hash = (
+        await asyncio.to_thread(verify_and_update_password, request.password, user.password_hash)
+        if user else (False, None)
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
     
+    # Upgrade bcrypt / legacy SHA-256 hashes to argon2id on successful login
+    if new_hash:
+        user.password_hash = new_hash
+        await db.commit()
+    
     # TASK-6.2: Create proper JWT token with user info
     token = create_access_token({
         "user_id": user.id,
@@ -242,9 +390,11 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
 @router.post("/upload/preview")
 async def preview_upload(file: UploadFile = File(...)):
     """Preview a CSV upload without committing."""
-    content = await file.read()
+    # Parse and serialize straight from the spooled upload, off the event loop;
+    # returning bytes skips FastAPI's jsonable_encoder walk over every detail row
     importer = ClinicalImporter()
-    return importer.preview(content)
+    content = await asyncio.to_thread(lambda: _json_dumps(importer.preview(file.file)))
+    return Response(content=content, media_type="application/json")
 
 @router.post("/upload/import")
 async def import_data(
@@ -253,25 +403,30 @@ async def import_data(
     db: Session = Depends(get_db)
 ):
     """Import CSV data transactionally and recompute risk."""
-    content = await file.read()
+    # Import and risk scoring are blocking DB + CPU work; run them off the event
+    # loop, streaming rows from the spooled upload rather than reading it whole
+    return await asyncio.to_thread(_import_and_score, db, file.file)
+
+
+def _import_and_score(db: Session, fileobj) -> dict:
     importer = ClinicalImporter()
     
-    result = importer.execute_import(db, content)
+    result = importer.execute_import(db, fileobj)
     
     if not result["success"]:
         return result
     
-    # Trigger Risk Recomputation
+    # Trigger Risk Recomputation - one batch for all affected patients
     affected_ids = result.get("affected_patient_ids", [])
     recalc_count = 0
     
-    for patient_id in affected_ids:
-        # Recompute risk
+    if affected_ids:
         try:
-            compute_risk_for_db_patient(patient_id, db)
-            recalc_count += 1
-        except Exception as e:
-            print(f"Error recomputing risk for {patient_id}: {e}")
+            recalc_count = len(compute_risk_for_many(db, affected_ids))
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("Error recomputing risk for imported patients")
             # Don't fail the import for strict risk calc error, but log it
     
     result["risk_recalc_count"] = recalc_count
@@ -282,21 +437,34 @@ async def import_data(
 # CONFIG
 # -----------------------------------------------------------------------------
 
+# Config is read-mostly: serve it from memory, reloading at most every
+# CONFIG_CACHE_TTL seconds. Writes in this process invalidate immediately;
+# other workers pick them up within the TTL.
+CONFIG_CACHE_TTL = 60  # seconds
+_config_cache: tuple = (0.0, {})  # (monotonic load time, {key: value})
+
+
 @router.get("/db/config")
-def get_config(db: Session = Depends(get_db)):
+async def get_config(db: AsyncSession = Depends(get_async_db)):
     """Get global application configuration."""
-    configs = db.query(AppConfig).all()
-    return {c.key: c.value for c in configs}
+    global _config_cache
+    loaded_at, config = _config_cache
+    if time.monotonic() - loaded_at >= CONFIG_CACHE_TTL:
+        result = await db.execute(select(AppConfig.key, AppConfig.value))
+        config = {key: value for key, value in result}
+        _config_cache = (time.monotonic(), config)
+    return dict(config)
 
 
 @router.post("/db/config")
-def update_config(
+async def update_config(
     request: ConfigUpdateRequest,
     current_user: TokenData = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update a configuration key (Admin only)."""
-    config = db.query(AppConfig).filter(AppConfig.key == request.key).first()
+    global _config_cache
+    config = await db.get(AppConfig, request.key)
     
     if not config:
         config = AppConfig(key=request.key, value=request.value)
@@ -304,7 +472,8 @@ def update_config(
     else:
         config.value = request.value
     
-    db.commit()
+    await db.commit()
+    _config_cache = (0.0, {})
     return {"status": "success", "key": request.key, "value": request.value}
 
 
@@ -313,19 +482,23 @@ def update_config(
 # -----------------------------------------------------------------------------
 
 @router.get("/db/users", response_model=List[UserListResponse])
-def list_users(
+async def list_users(
     current_user: TokenData = Depends(require_admin),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """List all users with their patient counts (Admin only)."""
-    users = db.query(User).all()
+    rows = (await db.execute(
+        select(User.id, User.email, User.name, User.role, func.count(Patient.id).label("patient_count"))
+        .outerjoin(Patient, Patient.created_by == User.id)
+        .group_by(User.id, User.email, User.name, User.role)
+    )).all()
     return [{
         "id": u.id,
         "email": u.email,
         "name": u.name,
         "role": u.role,
-        "patient_count": len(u.patients)
-    } for u in users]
+        "patient_count": u.patient_count
+    } for u in rows]
 
 
 # -----------------------------------------------------------------------------
@@ -333,23 +506,59 @@ def list_users(
 # -----------------------------------------------------------------------------
 
 @router.get("/db/patients", response_model=List[PatientResponse])
-def list_patients(db: Session = Depends(get_db)):
-    """List all patients from database."""
-    patients = db.query(Patient).order_by(Patient.current_risk_score.desc()).all()
-    return patients
+async def list_patients(
+    request: Request,
+    response: Response,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    List patients, highest risk first, `limit` per page.
+    Keyset-paginated on (current_risk_score, id): when more rows remain the
+    X-Next-Cursor header holds the `cursor` value for the next page.
+    """
+    cached = await not_modified(
+        request, response, db, select(func.max(Patient.updated_at), func.count(Patient.id)), limit, cursor
+    )
+    if cached:
+        return cached
+    
+    # Only the columns PatientResponse serializes
+    query = select(*PATIENT_COLUMNS)
+    if cursor:
+        try:
+            after_score, after_id = cursor.split("|", 1)
+            after_score = float(after_score)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(or_(
+            Patient.current_risk_score < after_score,
+            and_(Patient.current_risk_score == after_score, Patient.id > after_id),
+        ))
+    
+    result = await db.execute(
+        query.order_by(Patient.current_risk_score.desc(), Patient.id).limit(limit + 1)
+    )
+    patients = result.all()
+    if len(patients) > limit:
+        patients = patients[:limit]
+        last = patients[-1]
+        response.headers["X-Next-Cursor"] = f"{last.current_risk_score!r}|{last.id}"
+    return json_list(PatientListAdapter, patients, response)
 
 
 @router.get("/db/patients/{patient_id}", response_model=PatientResponse)
-def get_patient(patient_id: str, db: Session = Depends(get_db)):
+async def get_patient(patient_id: str, db: AsyncSession = Depends(get_async_db)):
     """Get a specific patient."""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = await db.get(Patient, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     return patient
 
 
 @router.post("/db/patients", response_model=PatientResponse)
-def create_patient(patient: PatientCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(require_doctor)):
+async def create_patient(patient: PatientCreate, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_doctor)):
     """Create a new patient."""
     new_patient = Patient(
         name=patient.name,
@@ -360,20 +569,19 @@ def create_patient(patient: PatientCreate, db: Session = Depends(get_db), curren
         current_risk_level="low"
     )
     db.add(new_patient)
-    db.commit()
-    db.refresh(new_patient)
+    await db.commit()
     return new_patient
 
 
 @router.delete("/db/patients/{patient_id}")
-def delete_patient(patient_id: str, db: Session = Depends(get_db), current_user: TokenData = Depends(require_admin)):
+async def delete_patient(patient_id: str, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_admin)):
     """Delete a patient."""
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = await db.get(Patient, patient_id)
     if not patient:
         raise HTTPException(status_code=404, detail="Patient not found")
     
-    db.delete(patient)
-    db.commit()
+    await db.delete(patient)
+    await db.commit()
     return {"message": "Patient deleted"}
 
 
@@ -381,40 +589,46 @@ def delete_patient(patient_id: str, db: Session = Depends(get_db), current_user:
 # VITALS
 # -----------------------------------------------------------------------------
 
+# TASK-5.4: Plausible ranges per vital type to reject obviously incorrect data
+VITAL_VALIDATION = MappingProxyType({
+    "heart_rate": (30, 300, "bpm"),
+    "blood_pressure": (50, 250, "mmHg systolic"),
+    "oxygen_sat": (50, 100, "%"),
+    "temperature": (30, 45, "°C"),
+    "glucose": (20, 600, "mg/dL"),
+    "blood_sugar": (20, 600, "mg/dL"),
+    "respiratory_rate": (5, 60, "breaths/min"),
+})
+
 @router.get("/db/patients/{patient_id}/vitals", response_model=List[VitalResponse])
-def get_patient_vitals(patient_id: str, db: Session = Depends(get_db)):
-    """Get all vitals for a patient."""
-    vitals = db.query(Vital).filter(
-        Vital.patient_id == patient_id
-    ).order_by(Vital.recorded_at.desc()).all()
-    return vitals
+async def get_patient_vitals(
+    patient_id: str,
+    request: Request,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get a patient's vitals, newest first: `limit` rows recorded before `before`.
+    Send `Accept: application/x-ndjson` to stream every matching row instead.
+    """
+    query = select(*VITAL_COLUMNS).where(Vital.patient_id == patient_id).order_by(Vital.recorded_at.desc())
+    if before:
+        query = query.where(Vital.recorded_at < before)
+    if wants_ndjson(request):
+        return ndjson_stream(query, VitalResponse)
+    result = await db.execute(query.limit(limit))
+    return json_list(VitalListAdapter, result.all())
 
 
 @router.post("/db/vitals", response_model=VitalResponse)
-def create_vital(vital: VitalCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(require_nurse)):
-    """Record a new vital sign and auto-compute risk score. Requires nurse role or higher."""
-    # Verify patient exists
-    patient = db.query(Patient).filter(Patient.id == vital.patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
+async def create_vital(vital: VitalCreate, tasks: BackgroundTasks, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_nurse)):
+    """Record a new vital sign and auto-compute risk score in the background. Requires nurse role or higher."""
     # TASK-5.4: Validate vital values to prevent obviously incorrect data
-    VITAL_VALIDATION = {
-        "heart_rate": (30, 300, "bpm"),
-        "heartRate": (30, 300, "bpm"),
-        "blood_pressure": (50, 250, "mmHg systolic"),
-        "bloodPressure": (50, 250, "mmHg systolic"),
-        "oxygen_sat": (50, 100, "%"),
-        "oxygenSat": (50, 100, "%"),
-        "temperature": (30, 45, "°C"),
-        "glucose": (20, 600, "mg/dL"),
-        "blood_sugar": (20, 600, "mg/dL"),
-        "respiratory_rate": (5, 60, "breaths/min"),
-        "respiratoryRate": (5, 60, "breaths/min"),
-    }
-    
-    if vital.vital_type in VITAL_VALIDATION:
-        min_val, max_val, unit_desc = VITAL_VALIDATION[vital.vital_type]
+    vital.vital_type = VITAL_TYPE_CANON.get(vital.vital_type, vital.vital_type)
+    bounds = VITAL_VALIDATION.get(vital.vital_type)
+    if bounds is not None:
+        min_val, max_val, unit_desc = bounds
         if not (min_val <= vital.value <= max_val):
             raise HTTPException(
                 status_code=422,
@@ -427,57 +641,58 @@ def create_vital(vital: VitalCreate, db: Session = Depends(get_db), current_user
         value=vital.value,
         value2=vital.value2,
         unit=vital.unit,
-        recorded_at=vital.recorded_at or datetime.utcnow()
+        recorded_at=vital.recorded_at or utc_now()
     )
-    db.add(new_vital)
-    db.commit()
-    db.refresh(new_vital)
+    saved = await save_patient_record(db, new_vital, VitalResponse)
     
-    # Auto-compute risk score with ML model
+    # Risk scoring runs after the response is sent
+    tasks.add_task(auto_score_patient, vital.patient_id)
+    return saved
+
+
+def auto_score_patient(patient_id: str):
+    """
+    Recompute and store a patient's risk after a new vital, raising an alert on
+    HIGH/CRITICAL risk. Runs as a background task with its own session.
+    """
+    db = SessionLocal()
     try:
-        result = compute_risk_for_db_patient(vital.patient_id, db)
+        patient = db.get(Patient, patient_id)
+        result = compute_risk_for_db_patient(patient_id, db, patient=patient)
         if result:
             patient.current_risk_score = result["risk_score"]
             patient.current_risk_level = result["risk_level"].lower()
             
             # Store in risk_scores history
             risk_record = RiskScore(
-                patient_id=vital.patient_id,
+                patient_id=patient_id,
                 risk_score=result["risk_score"],
                 risk_level=result["risk_level"],
                 model_used=result.get("model_used", "auto"),
                 confidence=result.get("confidence", 0),
             )
             db.add(risk_record)
-            db.commit()
             
-            # E2E-1 FIX: Auto-create alert on HIGH/CRITICAL risk
+            # E2E-1 FIX: Auto-create alert on HIGH/CRITICAL risk, unless the
+            # patient already has an active one
             if result["risk_level"] in ["HIGH", "CRITICAL"]:
-                # Check if active alert already exists for this patient
-                existing_alert = db.query(Alert).filter(
-                    Alert.patient_id == vital.patient_id,
-                    Alert.status == "active"
-                ).first()
-                
-                if not existing_alert:
-                    explanation_summary = result.get("explanation", {}).get("summary", [])
-                    new_alert = Alert(
-                        patient_id=vital.patient_id,
-                        severity="critical" if result["risk_level"] == "CRITICAL" else "high",
-                        title=f"{result['risk_level']} Risk Detected",
-                        explanation="; ".join(explanation_summary) if explanation_summary else "Elevated risk detected",
-                        status="active",
-                        auto_generated=True,
-                        risk_snapshot=json.dumps(result)
-                    )
-                    db.add(new_alert)
-                    db.commit()
-                    print(f"✓ Auto-generated alert for patient {vital.patient_id}")
-    except Exception as e:
-        # Don't fail the vital creation if risk scoring fails
-        print(f"Warning: Auto risk scoring failed: {e}")
-    
-    return new_vital
+                explanation_summary = result.get("explanation", {}).get("summary", [])
+                created = upsert_auto_alert(db, {
+                    "patient_id": patient_id,
+                    "severity": "critical" if result["risk_level"] == "CRITICAL" else "high",
+                    "title": f"{result['risk_level']} Risk Detected",
+                    "explanation": "; ".join(explanation_summary) if explanation_summary else "Elevated risk detected",
+                    "risk_snapshot": risk_snapshot_json(result),
+                })
+                if created:
+                    logger.info("Auto-generated alert for patient %s", patient_id)
+            db.commit()
+    except Exception:
+        # The vital is already saved; a scoring failure only skips the update
+        db.rollback()
+        logger.exception("Auto risk scoring failed for patient %s", patient_id)
+    finally:
+        db.close()
 
 
 # -----------------------------------------------------------------------------
@@ -485,46 +700,60 @@ def create_vital(vital: VitalCreate, db: Session = Depends(get_db), current_user
 # -----------------------------------------------------------------------------
 
 @router.get("/db/alerts", response_model=List[AlertResponse])
-def list_alerts(status_filter: Optional[str] = "active", db: Session = Depends(get_db)):
+async def list_alerts(request: Request, response: Response, status_filter: Optional[str] = "active", db: AsyncSession = Depends(get_async_db)):
     """List all alerts from database."""
-    query = db.query(Alert)
+    query = select(*ALERT_COLUMNS)
+    version_query = select(func.max(Alert.updated_at), func.count(Alert.id))
     if status_filter:
-        query = query.filter(Alert.status == status_filter)
+        query = query.where(Alert.status == status_filter)
+        version_query = version_query.where(Alert.status == status_filter)
+    
+    cached = await not_modified(request, response, db, version_query, status_filter)
+    if cached:
+        return cached
     
-    alerts = query.order_by(Alert.created_at.desc()).all()
-    return alerts
+    result = await db.execute(query.order_by(Alert.created_at.desc()))
+    return json_list(AlertListAdapter, result.all(), response)
 
 
 @router.get("/db/patients/{patient_id}/alerts", response_model=List[AlertResponse])
-def get_patient_alerts(patient_id: str, db: Session = Depends(get_db)):
-    """Get alerts for a specific patient."""
-    alerts = db.query(Alert).filter(Alert.patient_id == patient_id).all()
-    return alerts
+async def get_patient_alerts(
+    patient_id: str,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get alerts for a specific patient, newest first: `limit` rows created before `before`."""
+    query = select(*ALERT_COLUMNS).where(Alert.patient_id == patient_id)
+    if before:
+        query = query.where(Alert.created_at < before)
+    result = await db.execute(query.order_by(Alert.created_at.desc()).limit(limit))
+    return json_list(AlertListAdapter, result.all())
 
 
 @router.post("/db/alerts/{alert_id}/acknowledge")
-def acknowledge_alert(alert_id: str, db: Session = Depends(get_db), current_user: TokenData = Depends(require_nurse)):
+async def acknowledge_alert(alert_id: str, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_nurse)):
     """Acknowledge an alert."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
     alert.status = "acknowledged"
-    alert.acknowledged_at = datetime.utcnow()
-    db.commit()
+    alert.acknowledged_at = utc_now()
+    await db.commit()
     
     return {"message": "Alert acknowledged"}
 
 
 @router.post("/db/alerts/{alert_id}/dismiss")
-def dismiss_alert(alert_id: str, db: Session = Depends(get_db), current_user: TokenData = Depends(require_doctor)):
+async def dismiss_alert(alert_id: str, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_doctor)):
     """Dismiss an alert."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
     alert.status = "dismissed"
-    db.commit()
+    await db.commit()
     
     return {"message": "Alert dismissed"}
 
@@ -534,14 +763,14 @@ class FeedbackRequest(BaseModel):
 
 
 @router.post("/db/alerts/{alert_id}/feedback")
-def set_alert_feedback(
+async def set_alert_feedback(
     alert_id: str,
     request: FeedbackRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: TokenData = Depends(require_nurse)
 ):
     """Set feedback on an alert (helpful/not_helpful)."""
-    alert = db.query(Alert).filter(Alert.id == alert_id).first()
+    alert = await db.get(Alert, alert_id)
     if not alert:
         raise HTTPException(status_code=404, detail="Alert not found")
     
@@ -549,7 +778,7 @@ def set_alert_feedback(
         raise HTTPException(status_code=422, detail="Feedback must be 'helpful' or 'not_helpful'")
     
     alert.feedback = request.feedback
-    db.commit()
+    await db.commit()
     
     return {"message": f"Feedback set to {request.feedback}"}
 
@@ -560,11 +789,23 @@ def set_alert_feedback(
 # -----------------------------------------------------------------------------
 
 @router.get("/db/patients/{patient_id}/risk-history")
-def get_risk_history(patient_id: str, db: Session = Depends(get_db)):
+async def get_risk_history(patient_id: str, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
     """Get risk score history for a patient."""
-    scores = db.query(RiskScore).filter(
-        RiskScore.patient_id == patient_id
-    ).order_by(RiskScore.computed_at.desc()).limit(20).all()
+    # Risk scores are append-only, so newest timestamp + count identifies the history
+    cached = await not_modified(
+        request, response, db,
+        select(func.max(RiskScore.computed_at), func.count(RiskScore.id)).where(RiskScore.patient_id == patient_id),
+        patient_id,
+    )
+    if cached:
+        return cached
+    
+    result = await db.execute(
+        select(RiskScore.id, RiskScore.risk_score, RiskScore.risk_level, RiskScore.model_used, RiskScore.computed_at)
+        .where(RiskScore.patient_id == patient_id)
+        .order_by(RiskScore.computed_at.desc()).limit(20)
+    )
+    scores = result.all()
     
     return [
         {
@@ -583,34 +824,37 @@ def get_risk_history(patient_id: str, db: Session = Depends(get_db)):
 # -----------------------------------------------------------------------------
 
 @router.get("/db/patients/{patient_id}/labs", response_model=List[LabResponse])
-def get_patient_labs(patient_id: str, db: Session = Depends(get_db)):
-    """Get all lab results for a patient."""
-    labs = db.query(Lab).filter(
-        Lab.patient_id == patient_id
-    ).order_by(Lab.recorded_at.desc()).all()
-    return labs
+async def get_patient_labs(
+    patient_id: str,
+    request: Request,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get a patient's lab results, newest first: `limit` rows recorded before `before`.
+    Send `Accept: application/x-ndjson` to stream every matching row instead.
+    """
+    query = select(*LAB_COLUMNS).where(Lab.patient_id == patient_id).order_by(Lab.recorded_at.desc())
+    if before:
+        query = query.where(Lab.recorded_at < before)
+    if wants_ndjson(request):
+        return ndjson_stream(query, LabResponse)
+    result = await db.execute(query.limit(limit))
+    return json_list(LabListAdapter, result.all())
 
 
 @router.post("/db/labs", response_model=LabResponse)
-def create_lab(lab: LabCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(require_nurse)):
+async def create_lab(lab: LabCreate, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_nurse)):
     """Record a new lab result."""
-    # Verify patient exists
-    patient = db.query(Patient).filter(Patient.id == lab.patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
     new_lab = Lab(
         patient_id=lab.patient_id,
         lab_type=lab.lab_type,
         value=lab.value,
         unit=lab.unit,
-        recorded_at=lab.recorded_at or datetime.utcnow()
+        recorded_at=lab.recorded_at or utc_now()
     )
-    db.add(new_lab)
-    db.commit()
-    db.refresh(new_lab)
-    
-    return new_lab
+    return await save_patient_record(db, new_lab, LabResponse)
 
 
 # -----------------------------------------------------------------------------
@@ -618,88 +862,127 @@ def create_lab(lab: LabCreate, db: Session = Depends(get_db), current_user: Toke
 # -----------------------------------------------------------------------------
 
 @router.get("/db/patients/{patient_id}/notes", response_model=List[ClinicalNoteResponse])
-def get_patient_notes(patient_id: str, db: Session = Depends(get_db)):
-    """Get all clinical notes for a patient."""
-    notes = db.query(ClinicalNote).filter(
-        ClinicalNote.patient_id == patient_id
-    ).order_by(ClinicalNote.created_at.desc()).all()
-    return notes
+async def get_patient_notes(
+    patient_id: str,
+    limit: int = Query(HISTORY_PAGE_SIZE, ge=1, le=HISTORY_MAX_PAGE_SIZE),
+    before: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Get a patient's clinical notes, newest first: `limit` rows created before `before`."""
+    query = select(*NOTE_COLUMNS).where(ClinicalNote.patient_id == patient_id)
+    if before:
+        query = query.where(ClinicalNote.created_at < before)
+    result = await db.execute(query.order_by(ClinicalNote.created_at.desc()).limit(limit))
+    return json_list(NoteListAdapter, result.all())
 
 
 @router.post("/db/notes", response_model=ClinicalNoteResponse)
-def create_note(note: ClinicalNoteCreate, db: Session = Depends(get_db), current_user: TokenData = Depends(require_nurse)):
+async def create_note(note: ClinicalNoteCreate, db: AsyncSession = Depends(get_async_db), current_user: TokenData = Depends(require_nurse)):
     """Create a new clinical note."""
-    # Verify patient exists
-    patient = db.query(Patient).filter(Patient.id == note.patient_id).first()
-    if not patient:
-        raise HTTPException(status_code=404, detail="Patient not found")
-    
     new_note = ClinicalNote(
         patient_id=note.patient_id,
         note_type=note.note_type,
         content=note.content
     )
-    db.add(new_note)
-    db.commit()
-    db.refresh(new_note)
-    
-    return new_note
+    return await save_patient_record(db, new_note, ClinicalNoteResponse)
 
 
 # -----------------------------------------------------------------------------
 # RISK SCORING (ML Integration)
 # -----------------------------------------------------------------------------
 
-def compute_risk_for_db_patient(patient_id: str, db: Session) -> dict:
+# Vital types read by the risk model, mapped to one key per reading
+RISK_VITAL_ALIASES = {
+    "glucose": "glucose", "blood_sugar": "glucose",
+    "blood_pressure": "bp",
+    "heart_rate": "hr",
+    "temperature": "temp",
+    "lab_glucose": "lab_glucose",
+}
+RISK_VITAL_TYPES = tuple(k for k in RISK_VITAL_ALIASES if k != "lab_glucose")
+
+RISK_TABLE = RiskScore.__table__
+
+# Rule-based fallback: each rule adds its weight when the reading crosses the
+# threshold. Columns of the readings matrix are glucose, systolic BP, heart
+# rate, temperature, age; temperature is inclusive (>=), the rest strict (>).
+FALLBACK_BASE_RISK = 0.15
+FALLBACK_MAX_RISK = 0.85
+FALLBACK_COLUMNS = np.array([0, 0, 1, 1, 2, 3, 4])
+FALLBACK_THRESHOLDS = np.array([126, 180, 130, 140, 100, 38, 65], dtype=float)
+FALLBACK_WEIGHTS = np.array([0.12, 0.15, 0.08, 0.10, 0.08, 0.10, 0.08])
+FALLBACK_INCLUSIVE = np.array([False, False, False, False, False, True, False])
+
+
+def score_fallback_vectorized(readings: np.ndarray) -> np.ndarray:
     """
-    Compute risk score for a database patient using ML model.
-    Converts DB vitals to features and calls the ML scoring service.
+    Rule-based risk scores for an (n_patients, 5) readings matrix.
+    Missing readings are NaN and never trigger a rule.
     """
-    # Get patient
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
-    if not patient:
-        return None
+    values = readings[:, FALLBACK_COLUMNS]
+    hits = np.where(FALLBACK_INCLUSIVE, values >= FALLBACK_THRESHOLDS, values > FALLBACK_THRESHOLDS)
+    return np.minimum(FALLBACK_BASE_RISK + hits @ FALLBACK_WEIGHTS, FALLBACK_MAX_RISK)
+
+
+def _fallback_matrix(rows: List[tuple]) -> np.ndarray:
+    """Stack (readings dict, age) pairs into the fallback readings matrix."""
+    return np.array(
+        [
+            [readings.get("glucose"), readings.get("bp"), readings.get("hr"), readings.get("temp"), age]
+            for readings, age in rows
+        ],
+        dtype=float,
+    ).reshape(len(rows), 5)
+
+
+def _latest_risk_readings(db: Session, patient_ids: Optional[List[str]] = None) -> dict:
+    """
+    Latest glucose, systolic BP, heart rate and temperature per patient as
+    {patient_id: {"glucose": ..., "bp": ..., "hr": ..., "temp": ...}}.
+    One windowed UNION ALL over vitals and glucose labs; a glucose lab is only
+    used when there is no glucose vital.
+    """
+    latest_vitals = select(
+        Vital.patient_id, Vital.vital_type.label("kind"), Vital.value, Vital.recorded_at,
+        func.row_number().over(
+            partition_by=(Vital.patient_id, Vital.vital_type), order_by=Vital.recorded_at.desc()
+        ).label("rn"),
+    ).where(Vital.vital_type.in_(RISK_VITAL_TYPES))
+    latest_lab = select(
+        Lab.patient_id, literal("lab_glucose").label("kind"), Lab.value, Lab.recorded_at,
+        func.row_number().over(partition_by=Lab.patient_id, order_by=Lab.recorded_at.desc()).label("rn"),
+    ).where(Lab.lab_type.in_(["glucose", "blood_sugar"]))
+    if patient_ids is not None:
+        latest_vitals = latest_vitals.where(Vital.patient_id.in_(patient_ids))
+        latest_lab = latest_lab.where(Lab.patient_id.in_(patient_ids))
+    ranked = union_all(latest_vitals, latest_lab).subquery()
+    
+    # Collapse naming aliases in one pass, keeping the newest row per reading
+    newest = {}
+    for row in db.execute(
+        select(ranked.c.patient_id, ranked.c.kind, ranked.c.value, ranked.c.recorded_at).where(ranked.c.rn == 1)
+    ):
+        key = (row.patient_id, RISK_VITAL_ALIASES[row.kind])
+        current = newest.get(key)
+        if current is None or row.recorded_at > current.recorded_at:
+            newest[key] = row
     
-    # Get recent vitals
-    vitals = db.query(Vital).filter(
-        Vital.patient_id == patient_id
-    ).order_by(Vital.recorded_at.desc()).limit(20).all()
-    
-    # Get labs for glucose readings
-    labs = db.query(Lab).filter(
-        Lab.patient_id == patient_id
-    ).order_by(Lab.recorded_at.desc()).limit(10).all()
-    
-    # Extract latest values
-    latest_glucose = None
-    for v in vitals:
-        if v.vital_type in ['glucose', 'blood_sugar']:
-            latest_glucose = v.value
-            break
-    for l in labs:
-        if l.lab_type in ['glucose', 'blood_sugar'] and latest_glucose is None:
-            latest_glucose = l.value
-            break
-    
-    latest_bp_systolic = None
-    latest_bp_diastolic = None
-    for v in vitals:
-        if v.vital_type in ['bloodPressure', 'blood_pressure']:
-            latest_bp_systolic = v.value
-            latest_bp_diastolic = v.value2 or 80
-            break
-    
-    latest_heart_rate = None
-    for v in vitals:
-        if v.vital_type in ['heartRate', 'heart_rate']:
-            latest_heart_rate = v.value
-            break
-    
-    latest_temp = None
-    for v in vitals:
-        if v.vital_type == 'temperature':
-            latest_temp = v.value
-            break
+    readings = {}
+    for (pid, key), row in newest.items():
+        readings.setdefault(pid, {})[key] = row.value
+    for values in readings.values():
+        lab_glucose = values.pop("lab_glucose", None)
+        if values.get("glucose") is None:
+            values["glucose"] = lab_glucose
+    return readings
+
+
+def _risk_features(patient: Patient, readings: dict) -> tuple:
+    """ML features and the heart-rate/fever risk multiplier for one patient."""
+    latest_glucose = readings.get("glucose")
+    latest_bp_systolic = readings.get("bp")
+    latest_heart_rate = readings.get("hr")
+    latest_temp = readings.get("temp")
     
     # Build features for ML model
     # Compute simple trend indicators based on available data
@@ -734,22 +1017,60 @@ def compute_risk_for_db_patient(patient_id: str, db: Session) -> dict:
     if latest_temp and latest_temp > 38:
         risk_multiplier *= 1.2  # Fever increases risk
     
+    return features, risk_multiplier
+
+
+def risk_snapshot_json(result: dict) -> str:
+    """Serialize the parts of a risk result stored on an alert (Alert.risk_snapshot)."""
+    return _json_dumps({
+        "risk_score": result["risk_score"],
+        "risk_level": result["risk_level"],
+        "confidence": result.get("confidence"),
+        "features": result.get("features_used"),
+        "explanation": result.get("explanation"),
+        "model_used": result.get("model_used"),
+    })
+
+
+def _level_for_score(score: float) -> str:
+    if score >= 0.7:
+        return "HIGH"
+    elif score >= 0.4:
+        return "MEDIUM"
+    return "LOW"
+
+
+def compute_risk_for_db_patient(patient_id: str, db: Session, patient: Optional[Patient] = None) -> dict:
+    """
+    Compute risk score for a database patient using ML model.
+    Converts DB vitals to features and calls the ML scoring service.
+    Pass an already-loaded `patient` to skip re-fetching it.
+    """
+    # Get patient
+    if patient is None:
+        patient = db.get(Patient, patient_id)
+    if not patient:
+        return None
+    
+    readings = _latest_risk_readings(db, [patient_id]).get(patient_id, {})
+    latest_glucose = readings.get("glucose")
+    latest_bp_systolic = readings.get("bp")
+    latest_heart_rate = readings.get("hr")
+    latest_temp = readings.get("temp")
+    
+    features, risk_multiplier = _risk_features(patient, readings)
+    
     # Try to use the ML model service
     try:
-        from .main import score_risk, EXPLANATION_ENGINE
-        result = score_risk(features)
+        from .main import score_risk_pooled, EXPLANATION_ENGINE
+        result = score_risk_pooled(features)
         
         # Apply risk multiplier for additional factors
         base_score = result["risk_score"]
         adjusted_score = min(base_score * risk_multiplier, 1.0)
         
         # Adjust level based on score
-        if adjusted_score >= 0.7:
-            level = "HIGH"
-        elif adjusted_score >= 0.4:
-            level = "MEDIUM"
-        else:
-            level = "LOW"
+        level = _level_for_score(adjusted_score)
         
         # Generate explanation using ExplanationEngine
         explanation = None
@@ -785,36 +1106,29 @@ def compute_risk_for_db_patient(patient_id: str, db: Session) -> dict:
         }
     except Exception as e:
         # Fallback: Simple rule-based scoring with calibrated weights
-        score = 0.15  # Base risk
+        score = float(score_fallback_vectorized(_fallback_matrix([(readings, patient.age)]))[0])
         
         # Glucose/Sugar factors (labs)
         contributing_factors = []
         if latest_glucose and latest_glucose > 126:
-            score += 0.12  # Pre-diabetic
             contributing_factors.append({
                 "feature": "glucose",
                 "display_name": "Blood Glucose",
                 "value": latest_glucose,
                 "explanation": f"Glucose level {latest_glucose} mg/dL exceeds normal range (>126)"
             })
-        if latest_glucose and latest_glucose > 180:
-            score += 0.15  # Diabetic range
         
         # Blood pressure factors
         if latest_bp_systolic and latest_bp_systolic > 130:
-            score += 0.08  # Elevated
             contributing_factors.append({
                 "feature": "blood_pressure",
                 "display_name": "Blood Pressure",
                 "value": latest_bp_systolic,
                 "explanation": f"Systolic BP {latest_bp_systolic} mmHg is elevated (>130)"
             })
-        if latest_bp_systolic and latest_bp_systolic > 140:
-            score += 0.10  # High
         
         # Heart rate factor
         if latest_heart_rate and latest_heart_rate > 100:
-            score += 0.08  # Tachycardia
             contributing_factors.append({
                 "feature": "heart_rate",
                 "display_name": "Heart Rate",
@@ -824,7 +1138,6 @@ def compute_risk_for_db_patient(patient_id: str, db: Session) -> dict:
         
         # Temperature factor
         if latest_temp and latest_temp >= 38:
-            score += 0.10  # Fever
             contributing_factors.append({
                 "feature": "temperature",
                 "display_name": "Body Temperature",
@@ -834,7 +1147,6 @@ def compute_risk_for_db_patient(patient_id: str, db: Session) -> dict:
         
         # Age factor for elderly
         if patient.age and patient.age > 65:
-            score += 0.08
             contributing_factors.append({
                 "feature": "age",
                 "display_name": "Age",
@@ -842,15 +1154,7 @@ def compute_risk_for_db_patient(patient_id: str, db: Session) -> dict:
                 "explanation": f"Advanced age ({patient.age} years) increases baseline risk"
             })
         
-        # Cap at reasonable maximum (85% - very high risk but not 100%)
-        score = min(score, 0.85)
-        
-        if score >= 0.7:
-            level = "HIGH"
-        elif score >= 0.4:
-            level = "MEDIUM"
-        else:
-            level = "LOW"
+        level = _level_for_score(score)
         
         # Build explanation summary
         summary = []
@@ -888,7 +1192,7 @@ def compute_patient_risk(patient_id: str, db: Session = Depends(get_db), current
         raise HTTPException(status_code=404, detail="Patient not found")
     
     # Update patient record
-    patient = db.query(Patient).filter(Patient.id == patient_id).first()
+    patient = db.get(Patient, patient_id)
     patient.current_risk_score = result["risk_score"]
     patient.current_risk_level = result["risk_level"].lower()
     
@@ -905,43 +1209,20 @@ def compute_patient_risk(patient_id: str, db: Session = Depends(get_db), current
     # TASK-3.2 & 3.3: Auto-generate alert when risk is HIGH with deduplication
     alert_created = False
     if result["risk_level"] == "HIGH":
-        # Build risk snapshot for alert
-        risk_snapshot = json.dumps({
-            "risk_score": result["risk_score"],
-            "features": result.get("features_used"),
-            "explanation": result.get("explanation"),
-            "model_used": result.get("model_used"),
-        })
-        
-        # TASK-3.3: Check for existing active alert (deduplication)
-        existing_alert = db.query(Alert).filter(
-            Alert.patient_id == patient_id,
-            Alert.status == "active",
-            Alert.auto_generated == True,
-            Alert.created_at > datetime.utcnow() - timedelta(hours=24)
-        ).first()
-        
-        if existing_alert:
-            # Update existing alert instead of creating duplicate
-            existing_alert.risk_snapshot = risk_snapshot
-            existing_alert.updated_at = datetime.utcnow()
-            explanation_summary = result.get("explanation", {}).get("summary", [])
-            if explanation_summary:
-                existing_alert.explanation = explanation_summary[0]
-        else:
-            # Create new auto-generated alert
-            explanation_summary = result.get("explanation", {}).get("summary", [])
-            new_alert = Alert(
-                patient_id=patient_id,
-                severity="high",
-                title=f"Risk Deterioration - {int(result['risk_score'] * 100)}% Risk",
-                explanation=explanation_summary[0] if explanation_summary else f"Risk increased to {int(result['risk_score'] * 100)}%",
-                status="active",
-                risk_snapshot=risk_snapshot,
-                auto_generated=True,
-            )
-            db.add(new_alert)
-            alert_created = True
+        # TASK-3.3: One active auto alert per patient - refresh it rather than
+        # creating a duplicate
+        explanation_summary = result.get("explanation", {}).get("summary", [])
+        alert_created = upsert_auto_alert(
+            db,
+            {
+                "patient_id": patient_id,
+                "severity": "high",
+                "title": f"Risk Deterioration - {int(result['risk_score'] * 100)}% Risk",
+                "explanation": explanation_summary[0] if explanation_summary else f"Risk increased to {int(result['risk_score'] * 100)}%",
+                "risk_snapshot": risk_snapshot_json(result),
+            },
+            refresh=("risk_snapshot", "explanation") if explanation_summary else ("risk_snapshot",),
+        )
     
     db.commit()
     
@@ -954,9 +1235,73 @@ def compute_patient_risk(patient_id: str, db: Session = Depends(get_db), current
         "risk_level": result["risk_level"],
         "confidence": result["confidence"],
         "model_used": result.get("model_used"),
-        "computed_at": datetime.utcnow().isoformat(),
+        "computed_at": utc_now().isoformat(),
         "explanation": result.get("explanation"),
         "alert_created": alert_created,
         "velocity": velocity,  # NEW: stable, slowly_worsening, rapid_deterioration, improving, unknown
         "velocity_daily_change": daily_change,  # NEW: rate of change per day
     }
+
+
+def compute_risk_for_many(db: Session, patient_ids: Optional[List[str]] = None) -> dict:
+    """
+    Recompute and store risk for many patients (all when `patient_ids` is None).
+    Latest readings come from a single query, the ML model scores all patients
+    in one batch (rule-based fallback is vectorized), patient rows are
+    bulk-updated and history rows bulk-inserted. Alerts are not generated.
+    Returns {patient_id: risk_level}; the caller commits.
+    """
+    query = db.query(Patient)
+    if patient_ids is not None:
+        query = query.filter(Patient.id.in_(patient_ids))
+    patients = query.all()
+    if not patients:
+        return {}
+    
+    readings = _latest_risk_readings(db, patient_ids)
+    patient_readings = [readings.get(p.id, {}) for p in patients]
+    features_list, multipliers = zip(*(_risk_features(p, r) for p, r in zip(patients, patient_readings)))
+    
+    try:
+        from .main import score_risk_batch
+        results = score_risk_batch(list(features_list))
+        scores = np.minimum(np.array([r["risk_score"] for r in results]) * np.array(multipliers), 1.0)
+        models = [r.get("model_used", "general") for r in results]
+        confidences = [r.get("confidence", 0.8) for r in results]
+    except Exception as e:
+        logger.warning("Batch ML scoring failed, using rule-based fallback: %s", e)
+        scores = score_fallback_vectorized(_fallback_matrix([(r, p.age) for p, r in zip(patients, patient_readings)]))
+        models = ["rule_based_fallback"] * len(patients)
+        confidences = [0.6] * len(patients)
+    
+    levels = [_level_for_score(score) for score in scores.tolist()]
+    rounded = np.round(scores, 2).tolist()
+    
+    db.execute(update(Patient), [
+        {"id": p.id, "current_risk_score": score, "current_risk_level": level.lower()}
+        for p, score, level in zip(patients, rounded, levels)
+    ])
+    # Core executemany - history rows never need ORM identity tracking
+    db.execute(insert(RISK_TABLE), [
+        {
+            "patient_id": p.id,
+            "risk_score": score,
+            "risk_level": level,
+            "model_used": model_used,
+            "confidence": confidence,
+        }
+        for p, score, level, model_used, confidence in zip(patients, rounded, levels, models, confidences)
+    ])
+    return {p.id: level for p, level in zip(patients, levels)}
+
+
+@router.post("/db/recompute-all-risks")
+def recompute_all_risks(db: Session = Depends(get_db), current_user: TokenData = Depends(require_admin)):
+    """Recompute risk scores for every patient in one batch. Requires admin role."""
+    levels = compute_risk_for_many(db)
+    db.commit()
+    
+    by_level = {}
+    for level in levels.values():
+        by_level[level] = by_level.get(level, 0) + 1
+    return {"recomputed": len(levels), "by_level": by_level}
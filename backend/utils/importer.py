@@ -1,8 +1,9 @@
 
 import csv
 import io
-from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from datetime import datetime, timezone
+from itertools import islice
+from typing import BinaryIO, Iterator, List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass
 
 # =============================================================================
@@ -11,6 +12,22 @@ from dataclasses import dataclass
 
 REQUIRED_COLUMNS = ["mrn", "timestamp"]
 
+# Rows validated, matched to patients and inserted per batch during import
+IMPORT_CHUNK_SIZE = 1000
+
+# Leading rows whose original data is echoed back by preview (invalid rows always are)
+PREVIEW_ECHO_ROWS = 100
+
+# CSV column -> stored vital_type (diastolic is stored with systolic)
+VITAL_COLUMN_TYPES = {
+    "heart_rate": "heart_rate",
+    "respiratory_rate": "respiratory_rate",
+    "oxygen_sat": "oxygen_sat",
+    "temperature": "temperature",
+    "glucose": "glucose", # Dual use? Usually vital if standard check
+    "systolic": "blood_pressure" # Special handling
+}
+
 VALID_DATA_COLUMNS = {
     "systolic": {"min": 50, "max": 250, "unit": "mmHg"},
     "diastolic": {"min": 30, "max": 150, "unit": "mmHg"},
@@ -21,6 +38,14 @@ VALID_DATA_COLUMNS = {
     "glucose": {"min": 40, "max": 600, "unit": "mg/dL"},
 }
 
+# (column, min, max) for the per-row range checks, in VALID_DATA_COLUMNS order
+_COLUMN_LIMITS = tuple((col, rules["min"], rules["max"]) for col, rules in VALID_DATA_COLUMNS.items())
+
+# (column, vital_type, unit) for building Vital insert rows
+_VITAL_INSERTS = tuple(
+    (col, vital_type, VALID_DATA_COLUMNS[col]["unit"]) for col, vital_type in VITAL_COLUMN_TYPES.items()
+)
+
 @dataclass
 class ValidationResult:
     is_valid: bool
@@ -36,30 +61,69 @@ class ClinicalImporter:
 
     def parse_csv(self, file_content: bytes) -> List[Dict[str, str]]:
         """Parses raw CSV bytes into a list of dictionaries."""
-        content = file_content.decode("utf-8")
-        reader = csv.DictReader(io.StringIO(content))
-        return list(reader)
+        return list(self.stream_rows(io.BytesIO(file_content)))
 
-    def validate_row(self, row: Dict[str, str], row_idx: int) -> ValidationResult:
+    def stream_rows(self, fileobj: BinaryIO) -> Iterator[Dict[str, str]]:
+        """
+        Lazily parses CSV rows from a binary file object (e.g. an upload's
+        spooled file), so only the current row is held in memory.
+        """
+        text = io.TextIOWrapper(fileobj, encoding="utf-8", newline="")
+        try:
+            # csv.reader + zip is DictReader without its per-row Python overhead;
+            # blank lines and ragged rows are handled the same way DictReader does
+            reader = csv.reader(text)
+            header = next(reader, None)
+            if header is None:
+                return
+            width = len(header)
+            for values in reader:
+                if len(values) == width:
+                    yield dict(zip(header, values))
+                elif values:
+                    row = dict(zip(header, values))
+                    if len(values) > width:
+                        row[None] = values[width:]
+                    else:
+                        row.update(dict.fromkeys(header[len(values):]))
+                    yield row
+        finally:
+            text.detach()  # Leave the caller's file open
+
+    def _rows(self, source: Union[bytes, BinaryIO]) -> Iterator[Dict[str, str]]:
+        if isinstance(source, (bytes, bytearray)):
+            source = io.BytesIO(source)
+        return self.stream_rows(source)
+
+    def validate_rows(self, rows: List[Dict[str, str]], now: Optional[datetime] = None) -> List[ValidationResult]:
+        """Validates a batch of rows against one future-timestamp cutoff."""
+        now = now or datetime.now(timezone.utc).replace(tzinfo=None)
+        return [self.validate_row(row, i, now) for i, row in enumerate(rows)]
+
+    def validate_row(self, row: Dict[str, str], row_idx: int, now: Optional[datetime] = None) -> ValidationResult:
         """
         Validates a single row against schema and physiological rules.
+        `now` is the cutoff for future timestamps (defaults to the current UTC time).
         """
         errors = []
         warnings = []
         parsed = {}
 
-        # 1. Check Required Columns
+        # 1. Check Required Columns (each stripped once and reused below)
+        required = {}
         for col in REQUIRED_COLUMNS:
-            if col not in row or not row[col].strip():
+            value = (row.get(col) or "").strip()
+            if not value:
                 errors.append(f"Missing required column: {col}")
                 return ValidationResult(False, errors, warnings, {}) # Fatal
+            required[col] = value
 
-        parsed["mrn"] = row["mrn"].strip()
+        parsed["mrn"] = required["mrn"]
         
         # 2. Timestamp Validation
         try:
-            ts = datetime.fromisoformat(row["timestamp"].strip())
-            if ts > datetime.utcnow():
+            ts = datetime.fromisoformat(required["timestamp"])
+            if ts > (now or datetime.now(timezone.utc).replace(tzinfo=None)):
                 errors.append("Timestamp is in the future")
             parsed["timestamp"] = ts
         except ValueError:
@@ -70,23 +134,24 @@ class ClinicalImporter:
         systolic = None
         diastolic = None
 
-        for col, rules in VALID_DATA_COLUMNS.items():
-            if col in row and row[col].strip():
+        for col, min_val, max_val in _COLUMN_LIMITS:
+            raw = row.get(col)
+            if raw and raw.strip():
                 try:
-                    val = float(row[col])
+                    val = float(raw)
                     parsed[col] = val
                     has_data = True
 
                     # Range Checks (Warning vs Error logic could be strict, here using limits as boundaries)
                     # For safety, we treat extreme outliers as potential errors or strict warnings
-                    if val < rules["min"] or val > rules["max"]:
-                        warnings.append(f"{col} value {val} outside typical range ({rules['min']}-{rules['max']})")
+                    if val < min_val or val > max_val:
+                        warnings.append(f"{col} value {val} outside typical range ({min_val}-{max_val})")
 
                     if col == "systolic": systolic = val
                     if col == "diastolic": diastolic = val
 
                 except ValueError:
-                    errors.append(f"Invalid numeric value for {col}: {row[col]}")
+                    errors.append(f"Invalid numeric value for {col}: {raw}")
 
         if not has_data:
             errors.append("Row contains no valid vital signs data")
@@ -103,138 +168,133 @@ class ClinicalImporter:
             parsed_data=parsed if len(errors) == 0 else {}
         )
 
-    def preview(self, file_content: bytes) -> Dict:
+    def preview(self, source: Union[bytes, BinaryIO], max_echo_rows: int = PREVIEW_ECHO_ROWS) -> Dict:
         """
-        Preview a file without commiting.
-        Returns details on valid vs invalid rows.
+        Preview a file (raw bytes or a binary file object) without commiting.
+        Returns counts of valid vs invalid rows, plus details for the first
+        `max_echo_rows` rows and every invalid row; the rest are only counted,
+        so memory grows with the echoed rows rather than the file size.
         """
-        try:
-            rows = self.parse_csv(file_content)
-        except Exception as e:
-            return {"error": f"Failed to parse CSV: {str(e)}"}
-
         preview_results = []
+        total_count = 0
         valid_count = 0
         invalid_count = 0
+        columns = []
 
-        for i, row in enumerate(rows):
-            res = self.validate_row(row, i)
-            if res.is_valid:
-                valid_count += 1
-            else:
-                invalid_count += 1
-            
-            preview_results.append({
-                "row_index": i + 1,
-                "is_valid": res.is_valid,
-                "errors": res.errors,
-                "warnings": res.warnings,
-                "original_data": row # Return original for UI display
-            })
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        try:
+            rows = self._rows(source)
+            for chunk in iter(lambda: list(islice(rows, IMPORT_CHUNK_SIZE)), []):
+                if not columns:
+                    columns = list(chunk[0].keys())
+                for row, res in zip(chunk, self.validate_rows(chunk, now)):
+                    total_count += 1
+                    if res.is_valid:
+                        valid_count += 1
+                        if total_count > max_echo_rows:
+                            continue
+                    else:
+                        invalid_count += 1
+
+                    preview_results.append({
+                        "row_index": total_count,
+                        "is_valid": res.is_valid,
+                        "errors": res.errors,
+                        "warnings": res.warnings,
+                        "original_data": row # Return original for UI display
+                    })
+        except Exception as e:
+            return {"error": f"Failed to parse CSV: {str(e)}"}
 
         return {
-            "total_rows": len(rows),
+            "total_rows": total_count,
             "valid_rows": valid_count,
             "invalid_rows": invalid_count,
             "details": preview_results,
-            "columns": list(rows[0].keys()) if rows else []
+            "columns": columns,
+            "truncated": total_count > max_echo_rows
         }
 
-    def execute_import(self, db, file_content: bytes) -> Dict:
+    def execute_import(self, db, source: Union[bytes, BinaryIO]) -> Dict:
         """
-        Executes the import transactionally.
-        1. Validate all rows again (safety).
-        2. Group by MRN.
-        3. Fetch Patients.
-        4. Insert Vitals/Labs.
+        Executes the import transactionally, streaming the file in chunks of
+        IMPORT_CHUNK_SIZE rows.
+        1. Validate each row again (safety).
+        2. Fetch Patients for the chunk's new MRNs in one query.
+        3. Insert the chunk's Vitals in one executemany.
+        4. Commit only if every row was valid; otherwise roll back.
         5. Return affected patient IDs for risk recomputation.
         """
-        rows = self.parse_csv(file_content)
-        
-        # 1. Helper to find patient by MRN
-        from backend.database import Patient, Vital, Lab
-        
-        # Pre-fetch all patients with MRNs to minimize queries (or just query as we go if batch small)
-        # For robustness, let's query.
+        from sqlalchemy import insert, select
+        from backend.database import Patient, Vital
         
         affected_patient_ids = set()
         created_records = 0
         errors = []
-
-        # Validate whole batch first - if ANY schema error, reject all? 
-        # The plan said "Atomic Transaction".
-        # Let's iterate and collect operations.
-        
-        operations = [] # List of (model_instance) to add
-        
-        # Cache patients
-        existing_patients = {p.mrn: p for p in db.query(Patient).filter(Patient.mrn.isnot(None)).all()}
-
-        for i, row in enumerate(rows):
-            res = self.validate_row(row, i)
-            if not res.is_valid:
-                errors.append(f"Row {i+1}: {'; '.join(res.errors)}")
-                continue
-
-            data = res.parsed_data
-            mrn = data["mrn"]
-            
-            patient = existing_patients.get(mrn)
-            if not patient:
-                errors.append(f"Row {i+1}: Patient with MRN '{mrn}' not found")
-                continue
-
-            affected_patient_ids.add(patient.id)
-            ts = data["timestamp"]
-
-            # Vitals
-            vital_map = {
-                "heart_rate": "heartRate",
-                "respiratory_rate": "respiratoryRate",
-                "oxygen_sat": "oxygenSat",
-                "temperature": "temperature",
-                "glucose": "glucose", # Dual use? Usually vital if standard check
-                "systolic": "bloodPressure" # Special handling
-            }
-
-            for csv_col, db_type in vital_map.items():
-                if csv_col in data:
-                    val = data[csv_col]
-                    val2 = None
-                    
-                    # Special BP handling
-                    if csv_col == "systolic":
-                        val2 = data.get("diastolic") # Validated as present if systolic is present in validate_row?
-                        # validate_row checks limit but maybe not presence of diastolic if systolic present?
-                        # Let's re-verify validate_row logic. 
-                        # It checks: if systolic <= diastolic error. But doesn't explicitly fail if one missing?
-                        # Actually logic in validate_row:
-                        # if systolic is not None and diastolic is not None: check.
-                        # We need to ensure we only insert if we have complete BP.
-                        if "diastolic" not in data:
-                            continue # Skip incomplete BP
-                    
-                    if csv_col == "diastolic":
-                        continue # Handled with systolic
-
-                    vital = Vital(
-                        patient_id=patient.id,
-                        vital_type=db_type,
-                        value=val,
-                        value2=val2,
-                        unit=VALID_DATA_COLUMNS[csv_col]["unit"],
-                        recorded_at=ts
-                    )
-                    operations.append(vital)
-                    created_records += 1
-
-        if errors:
-            return {"success": False, "errors": errors, "records_count": 0}
+        patient_ids = {}  # mrn -> patient id (None when unknown), filled per chunk
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
 
         try:
-            # Atomic commit
-            for op in operations:
-                db.add(op)
+            rows = self._rows(source)
+            row_offset = 0
+            for chunk in iter(lambda: list(islice(rows, IMPORT_CHUNK_SIZE)), []):
+                validated = list(enumerate(self.validate_rows(chunk, now), start=row_offset))
+                row_offset += len(chunk)
+
+                new_mrns = {res.parsed_data["mrn"] for _, res in validated if res.is_valid} - patient_ids.keys()
+                if new_mrns:
+                    patient_ids.update(dict.fromkeys(new_mrns))
+                    patient_ids.update(db.execute(select(Patient.mrn, Patient.id).where(Patient.mrn.in_(new_mrns))).all())
+
+                vital_rows = [] # Column dicts for this chunk's bulk INSERT
+                for i, res in validated:
+                    if not res.is_valid:
+                        errors.append(f"Row {i+1}: {'; '.join(res.errors)}")
+                        continue
+
+                    data = res.parsed_data
+                    mrn = data["mrn"]
+                    
+                    patient_id = patient_ids.get(mrn)
+                    if not patient_id:
+                        errors.append(f"Row {i+1}: Patient with MRN '{mrn}' not found")
+                        continue
+
+                    affected_patient_ids.add(patient_id)
+                    ts = data["timestamp"]
+
+                    for csv_col, db_type, unit in _VITAL_INSERTS:
+                        val = data.get(csv_col)
+                        if val is None:
+                            continue
+                        val2 = None
+
+                        # Special BP handling - only insert complete readings
+                        if csv_col == "systolic":
+                            val2 = data.get("diastolic")
+                            if val2 is None:
+                                continue # Skip incomplete BP
+
+                        vital_rows.append({
+                            "patient_id": patient_id,
+                            "vital_type": db_type,
+                            "value": val,
+                            "value2": val2,
+                            "unit": unit,
+                            "recorded_at": ts,
+                        })
+                        created_records += 1
+
+                # Once any row fails the import is rejected; keep validating to report every error
+                if vital_rows and not errors:
+                    db.execute(insert(Vital), vital_rows)
+
+            if errors:
+                db.rollback()
+                return {"success": False, "errors": errors, "records_count": 0}
+
+            # Atomic commit - all chunks land together
             db.commit()
             return {
                 "success": True, 
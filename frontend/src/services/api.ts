@@ -139,6 +139,7 @@ export interface ValidationResult {
         original_data: Record<string, string>;
     }>;
     columns: string[];
+    truncated?: boolean;
     error?: string;
 }
 
@@ -211,9 +212,17 @@ export const api = {
     // =========================================================================
 
     async getPatients(): Promise<Patient[]> {
-        const response = await fetch(`${API_BASE_URL}/db/patients`);
-        if (!response.ok) throw new Error('Failed to fetch patients');
-        return response.json();
+        // The list is paginated; follow X-Next-Cursor until every page is loaded
+        const patients: Patient[] = [];
+        let cursor: string | null = null;
+        do {
+            const query: string = cursor ? `?limit=1000&cursor=${encodeURIComponent(cursor)}` : '?limit=1000';
+            const response = await fetch(`${API_BASE_URL}/db/patients${query}`);
+            if (!response.ok) throw new Error('Failed to fetch patients');
+            patients.push(...(await response.json()));
+            cursor = response.headers.get('X-Next-Cursor');
+        } while (cursor);
+        return patients;
     },
 
     async getPatient(patientId: string): Promise<Patient> {
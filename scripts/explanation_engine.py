@@ -17,6 +17,7 @@ Usage:
 """
 
 import json
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
@@ -264,6 +265,7 @@ class ExplanationEngine:
 # STANDALONE FUNCTIONS
 # =============================================================================
 
+@lru_cache(maxsize=8)
 def load_feature_importance(model_name: str = "logistic_regression") -> Dict[str, float]:
     """Load feature importance from trained model metadata."""
     models_dir = Path(__file__).parent.parent / "models"
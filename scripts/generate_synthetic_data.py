@@ -14,12 +14,22 @@ Usage:
 
 import argparse
 import json
+import os
 import random
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Tuple
 import csv
 
+try:
+    import orjson
+    def _dump_json(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dump_json(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 
 # =============================================================================
 # CONFIGURATION
@@ -28,6 +38,9 @@ import csv
 # Default output directory
 DEFAULT_OUTPUT = Path(__file__).parent.parent / "data" / "synthetic"
 
+# Threads overlapping timeline file writes
+JSON_WRITE_WORKERS = 8
+
 # Patient demographics ranges
 AGE_RANGE = (35, 75)
 GENDERS = ["M", "F"]
@@ -95,16 +108,17 @@ def generate_timeline_stable(start_date: datetime, num_visits: int) -> Dict[str,
                                      BASELINE_VITALS["diastolic_bp"]["max"])
     
     for i in range(num_visits):
-        date_str = current_date.strftime("%Y-%m-%d")
+        date_str = current_date.date().isoformat()
         
         # Add small random variation (stable patient)
         sugar = base_sugar + random.uniform(-5, 5)
         systolic = base_systolic + random.uniform(-5, 5)
         diastolic = base_diastolic + random.uniform(-3, 3)
         
-        timeline["blood_sugar"].append({"date": date_str, "value": round(sugar, 1)})
+        timeline["blood_sugar"].append({"date": date_str, "timestamp": current_date, "value": round(sugar, 1)})
         timeline["blood_pressure"].append({
             "date": date_str, 
+            "timestamp": current_date,
             "systolic": round(systolic, 1), 
             "diastolic": round(diastolic, 1)
         })
@@ -151,12 +165,13 @@ def generate_timeline_deteriorating(start_date: datetime, num_visits: int) -> Di
     ]
     
     for i in range(num_visits):
-        date_str = current_date.strftime("%Y-%m-%d")
+        date_str = current_date.date().isoformat()
         
         # Record values
-        timeline["blood_sugar"].append({"date": date_str, "value": round(sugar, 1)})
+        timeline["blood_sugar"].append({"date": date_str, "timestamp": current_date, "value": round(sugar, 1)})
         timeline["blood_pressure"].append({
             "date": date_str, 
+            "timestamp": current_date,
             "systolic": round(systolic, 1), 
             "diastolic": round(diastolic, 1)
         })
@@ -168,7 +183,7 @@ def generate_timeline_deteriorating(start_date: datetime, num_visits: int) -> Di
         # Add medication if late in timeline (simulating delayed treatment)
         if i >= num_visits - 2:
             if not timeline["medications"]:
-                timeline["medications"].append({"date": date_str, "name": "Metformin 500mg"})
+                timeline["medications"].append({"date": date_str, "timestamp": current_date, "name": "Metformin 500mg"})
         
         # Apply deterioration
         months_passed = random.randint(3, 6)
@@ -182,6 +197,34 @@ def generate_timeline_deteriorating(start_date: datetime, num_visits: int) -> Di
     return timeline
 
 
+def _visit_date(entry: Dict[str, Any]) -> datetime:
+    """Visit datetime, parsing the date string only for entries loaded from JSON."""
+    ts = entry.get("timestamp")
+    return ts if ts is not None else datetime.fromisoformat(entry["date"])
+
+
+def _volatility(values: List[float]) -> float:
+    """Population standard deviation, rounded (0 for fewer than 3 points)."""
+    if len(values) < 3:
+        return 0
+    mean_val = sum(values) / len(values)
+    variance = sum((x - mean_val) ** 2 for x in values) / len(values)
+    return round(variance ** 0.5, 2)
+
+
+def _max_consecutive_increase(values: List[float]) -> int:
+    """Longest run of visit-over-visit increases."""
+    consecutive = 0
+    max_consecutive = 0
+    for prev, cur in zip(values, values[1:]):
+        if cur > prev:
+            consecutive += 1
+            max_consecutive = max(max_consecutive, consecutive)
+        else:
+            consecutive = 0
+    return max_consecutive
+
+
 def compute_trend_features(timeline: Dict[str, List]) -> Dict[str, Any]:
     """
     Compute trend features from timeline (matches PDF Model 1 - Trend Detector).
@@ -191,6 +234,8 @@ def compute_trend_features(timeline: Dict[str, List]) -> Dict[str, Any]:
     - New: velocity, volatility, consecutive_increase, max_spike, time_since_baseline
     """
     features = {}
+    dates = None      # Visit dates, shared between the sugar and BP blocks
+    date_strs = None
     
     # Blood sugar trends
     if timeline["blood_sugar"]:
@@ -206,7 +251,8 @@ def compute_trend_features(timeline: Dict[str, List]) -> Dict[str, Any]:
             features["sugar_last"] = last
             
             # Duration calculation
-            dates = [datetime.strptime(v["date"], "%Y-%m-%d") for v in timeline["blood_sugar"]]
+            date_strs = [v["date"] for v in timeline["blood_sugar"]]
+            dates = [_visit_date(v) for v in timeline["blood_sugar"]]
             duration_months = (dates[-1] - dates[0]).days / 30
             features["trend_duration_months"] = round(duration_months)
             
@@ -219,23 +265,10 @@ def compute_trend_features(timeline: Dict[str, List]) -> Dict[str, Any]:
                 features["sugar_velocity"] = 0
             
             # 2. Volatility (standard deviation)
-            if len(sugar_values) >= 3:
-                mean_val = sum(sugar_values) / len(sugar_values)
-                variance = sum((x - mean_val) ** 2 for x in sugar_values) / len(sugar_values)
-                features["sugar_volatility"] = round(variance ** 0.5, 2)
-            else:
-                features["sugar_volatility"] = 0
+            features["sugar_volatility"] = _volatility(sugar_values)
             
             # 3. Consecutive increase count
-            consecutive = 0
-            max_consecutive = 0
-            for i in range(1, len(sugar_values)):
-                if sugar_values[i] > sugar_values[i-1]:
-                    consecutive += 1
-                    max_consecutive = max(max_consecutive, consecutive)
-                else:
-                    consecutive = 0
-            features["sugar_consecutive_increase"] = max_consecutive
+            features["sugar_consecutive_increase"] = _max_consecutive_increase(sugar_values)
             
             # 4. Max spike (highest value - baseline)
             features["sugar_max_spike"] = round(max(sugar_values) - first, 1)
@@ -261,8 +294,11 @@ def compute_trend_features(timeline: Dict[str, List]) -> Dict[str, Any]:
             features["bp_percent_change"] = round(((last_bp - first_bp) / first_bp) * 100, 1)
             features["bp_trend_up"] = 1 if last_bp > first_bp else 0
             
-            # NEW: BP velocity
-            dates = [datetime.strptime(v["date"], "%Y-%m-%d") for v in timeline["blood_pressure"]]
+            # NEW: BP velocity (BP is recorded at the same visits as sugar;
+            # reuse those dates when they match)
+            bp_dates = [v["date"] for v in timeline["blood_pressure"]]
+            if dates is None or bp_dates != date_strs:
+                dates = [_visit_date(v) for v in timeline["blood_pressure"]]
             duration_months = (dates[-1] - dates[0]).days / 30
             if duration_months > 0:
                 features["bp_velocity"] = round((last_bp - first_bp) / duration_months, 2)
@@ -270,28 +306,15 @@ def compute_trend_features(timeline: Dict[str, List]) -> Dict[str, Any]:
                 features["bp_velocity"] = 0
             
             # NEW: BP volatility
-            if len(bp_values) >= 3:
-                mean_bp = sum(bp_values) / len(bp_values)
-                variance = sum((x - mean_bp) ** 2 for x in bp_values) / len(bp_values)
-                features["bp_volatility"] = round(variance ** 0.5, 2)
-            else:
-                features["bp_volatility"] = 0
+            features["bp_volatility"] = _volatility(bp_values)
             
             # NEW: BP consecutive increase
-            consecutive = 0
-            max_consecutive = 0
-            for i in range(1, len(bp_values)):
-                if bp_values[i] > bp_values[i-1]:
-                    consecutive += 1
-                    max_consecutive = max(max_consecutive, consecutive)
-                else:
-                    consecutive = 0
-            features["bp_consecutive_increase"] = max_consecutive
+            features["bp_consecutive_increase"] = _max_consecutive_increase(bp_values)
     
     # Medication delay indicator
     if timeline["medications"]:
-        med_date = datetime.strptime(timeline["medications"][0]["date"], "%Y-%m-%d")
-        first_date = datetime.strptime(timeline["blood_sugar"][0]["date"], "%Y-%m-%d")
+        med_date = _visit_date(timeline["medications"][0])
+        first_date = _visit_date(timeline["blood_sugar"][0])
         months_to_med = (med_date - first_date).days / 30
         features["medication_delay"] = 1 if months_to_med > 12 else 0
         features["medication_delay_months"] = round(months_to_med)  # NEW: Actual delay
@@ -343,6 +366,30 @@ def generate_patient(deteriorating: bool = False) -> Dict[str, Any]:
     }
 
 
+def generate_patient_seeded(job: Tuple[bool, int]) -> Dict[str, Any]:
+    """
+    Generate one patient from a (deteriorating, seed) job. Seeding per patient
+    keeps output reproducible however the jobs are spread across workers.
+    """
+    deteriorating, seed = job
+    random.seed(seed)
+    return generate_patient(deteriorating)
+
+
+def generate_patients(num_stable: int, num_deteriorating: int, rng: random.Random,
+                      workers: int = 1) -> List[Dict[str, Any]]:
+    """
+    Generate all patients, across `workers` processes when more than one.
+    Per-patient seeds are drawn from `rng`, which job seeding leaves untouched.
+    """
+    jobs = [(deteriorating, rng.getrandbits(32))
+            for deteriorating in [False] * num_stable + [True] * num_deteriorating]
+    if workers <= 1:
+        return [generate_patient_seeded(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(generate_patient_seeded, jobs, chunksize=64))
+
+
 # =============================================================================
 # OUTPUT GENERATORS
 # =============================================================================
@@ -352,15 +399,25 @@ def save_as_json(patients: List[Dict], output_dir: Path):
     timeline_dir = output_dir / "timelines"
     timeline_dir.mkdir(parents=True, exist_ok=True)
     
-    for patient in patients:
+    def write_timeline(patient: Dict):
         filepath = timeline_dir / f"{patient['patient_id']}.json"
-        # Save only timeline data (matches architecture model)
+        # Save only timeline data (matches architecture model); in-memory
+        # visit timestamps are dropped, "date" carries the same day
         timeline_data = {
             "patient_id": patient["patient_id"],
             "demographics": patient["demographics"],
-            "timeline": patient["timeline"],
+            "timeline": {
+                key: [{k: v for k, v in entry.items() if k != "timestamp"} for entry in entries]
+                for key, entries in patient["timeline"].items()
+            },
         }
-        filepath.write_text(json.dumps(timeline_data, indent=2))
+        filepath.write_bytes(_dump_json(timeline_data))
+    
+    # One write per file (the last patient wins on a duplicate ID, as with a
+    # sequential loop), so concurrent writers never share a path
+    unique = {patient["patient_id"]: patient for patient in patients}
+    with ThreadPoolExecutor(max_workers=JSON_WRITE_WORKERS) as executor:
+        list(executor.map(write_timeline, unique.values()))
     
     print(f"   ✓ Saved {len(patients)} timeline JSON files to {timeline_dir}")
 
@@ -370,31 +427,29 @@ def save_training_csv(patients: List[Dict], output_dir: Path):
     output_dir.mkdir(parents=True, exist_ok=True)
     filepath = output_dir / "training_data.csv"
     
-    # Flatten features for training
-    rows = []
-    for p in patients:
-        row = {
-            "patient_id": p["patient_id"],
-            "age": p["demographics"]["age"],
-            "sex": 1 if p["demographics"]["sex"] == "M" else 0,
-            **p["trend_features"],
-            "label": p["label"],
-        }
-        rows.append(row)
-    
-    # Write CSV
-    if rows:
-        fieldnames = rows[0].keys()
+    # Flatten features for training, streaming rows in a fixed column order
+    if patients:
+        feature_names = list(patients[0]["trend_features"])
+        fieldnames = ["patient_id", "age", "sex", *feature_names, "label"]
         with open(filepath, "w", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
+            writer = csv.writer(f)
+            writer.writerow(fieldnames)
+            writer.writerows(
+                (
+                    p["patient_id"],
+                    p["demographics"]["age"],
+                    1 if p["demographics"]["sex"] == "M" else 0,
+                    *(p["trend_features"].get(name, "") for name in feature_names),
+                    p["label"],
+                )
+                for p in patients
+            )
     
     print(f"   ✓ Saved training CSV to {filepath}")
     
     # Print label distribution
-    label_1 = sum(1 for r in rows if r["label"] == 1)
-    label_0 = len(rows) - label_1
+    label_1 = sum(1 for p in patients if p["label"] == 1)
+    label_0 = len(patients) - label_1
     print(f"   ✓ Label distribution: {label_0} stable (0), {label_1} deteriorating (1)")
 
 
@@ -423,8 +478,12 @@ def main():
     parser.add_argument("--patients", type=int, default=100, help="Number of patients to generate")
     parser.add_argument("--output", type=str, default=str(DEFAULT_OUTPUT), help="Output directory")
     parser.add_argument("--deterioration-ratio", type=float, default=0.3, help="Ratio of deteriorating patients (0-1)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for patient generation")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible output")
     args = parser.parse_args()
     
+    rng = random.Random(args.seed)
+    
     print("=" * 60)
     print("🏥 Clinical Intelligence Platform - Synthetic Data Generator")
     print("=" * 60)
@@ -438,16 +497,11 @@ def main():
     print(f"   - {num_deteriorating} deteriorating (label=1)")
     
     # Generate patients
-    patients = []
-    
     print("\n⏳ Generating timelines...")
-    for _ in range(num_stable):
-        patients.append(generate_patient(deteriorating=False))
-    for _ in range(num_deteriorating):
-        patients.append(generate_patient(deteriorating=True))
+    patients = generate_patients(num_stable, num_deteriorating, rng, args.workers)
     
-    # Shuffle
-    random.shuffle(patients)
+    # Shuffle (after generation, so order doesn't depend on the worker count)
+    rng.shuffle(patients)
     
     # Save outputs
     print("\n💾 Saving data...")
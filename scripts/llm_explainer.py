@@ -15,8 +15,11 @@ Usage:
     polished = explainer.polish("Blood sugar increased 29% over 18 months")
 """
 
+import asyncio
 import json
-from typing import Dict, List, Any, Optional
+import re
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
 try:
     import ollama
@@ -32,6 +35,19 @@ except ImportError:
 
 MODEL_NAME = "deepseek-r1:latest"
 
+# Polished responses kept per (model, facts, risk level) - templated rule-engine
+# facts recur across a cohort, so repeats skip the LLM round-trip
+RESPONSE_CACHE_SIZE = 2048
+
+# Concurrent requests polish_many keeps in flight against Ollama
+POLISH_CONCURRENCY = 4
+
+# Post-generation safety check: any of these (case-insensitive, also inside
+# longer words such as "treatment") rejects the LLM output
+UNSAFE_PHRASES = ["should", "recommend", "diagnosis", "diagnose", "treat", "prescribe"]
+UNSAFE_RE = re.compile("|".join(map(re.escape, UNSAFE_PHRASES)), re.IGNORECASE)
+_UNSAFE_OVERLAP = max(map(len, UNSAFE_PHRASES)) - 1  # Phrase may straddle two stream chunks
+
 # System prompt - constrains LLM to only rephrase, never add medical claims
 SYSTEM_PROMPT = """You are a clinical explanation assistant. Your ONLY job is to rephrase medical facts into clear, readable language.
 
@@ -52,6 +68,49 @@ Your output should be a natural paragraph that contains ONLY the information pro
 # LLM EXPLAINER
 # =============================================================================
 
+@lru_cache(maxsize=RESPONSE_CACHE_SIZE)
+def _chat_cached(model_name: str, explanation_facts: Tuple[str, ...], risk_level: str) -> str:
+    """
+    Ask the LLM to rephrase one fact list. Cached on its (immutable) arguments;
+    errors propagate and are not cached, so a failed call is retried next time.
+    The response is streamed and abandoned at the first unsafe phrase; the
+    partial text returned then still fails the caller's safety check.
+    """
+    # Build prompt
+    facts_text = "\n".join(f"- {fact}" for fact in explanation_facts)
+    
+    prompt = f"""The following are verified medical facts about a patient. Rephrase them into a single, clear paragraph for clinical staff. Do not add any new information.
+
+Risk Level: {risk_level}
+
+Facts:
+{facts_text}
+
+Write a clear, professional summary:"""
+    
+    stream = ollama.chat(
+        model=model_name,
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ],
+        options={"temperature": 0.3},  # Low temperature for consistency
+        stream=True,
+    )
+    
+    text = ""
+    try:
+        for chunk in stream:
+            scan_from = max(0, len(text) - _UNSAFE_OVERLAP)
+            text += chunk["message"]["content"]
+            if UNSAFE_RE.search(text, scan_from):
+                break  # Stop generation early; no point decoding the rest
+    finally:
+        stream.close()
+    
+    return text.strip()
+
+
 class LLMExplainer:
     """
     Uses local Ollama LLM to polish rule-based explanations.
@@ -84,36 +143,14 @@ class LLMExplainer:
         if not self.available or not explanation_facts:
             return "; ".join(explanation_facts) if explanation_facts else ""
         
-        # Build prompt
-        facts_text = "\n".join(f"- {fact}" for fact in explanation_facts)
-        
-        prompt = f"""The following are verified medical facts about a patient. Rephrase them into a single, clear paragraph for clinical staff. Do not add any new information.
-
-Risk Level: {risk_level}
-
-Facts:
-{facts_text}
-
-Write a clear, professional summary:"""
-        
         try:
-            response = ollama.chat(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": SYSTEM_PROMPT},
-                    {"role": "user", "content": prompt}
-                ],
-                options={"temperature": 0.3}  # Low temperature for consistency
-            )
-            
-            polished = response["message"]["content"].strip()
+            polished = _chat_cached(self.model_name, tuple(explanation_facts), risk_level)
             
             # Safety check - ensure no diagnostic language slipped through
-            unsafe_phrases = ["should", "recommend", "diagnosis", "diagnose", "treat", "prescribe"]
-            for phrase in unsafe_phrases:
-                if phrase.lower() in polished.lower():
-                    print(f"⚠️ Safety check failed: '{phrase}' found in output")
-                    return "; ".join(explanation_facts)
+            match = UNSAFE_RE.search(polished)
+            if match:
+                print(f"⚠️ Safety check failed: '{match.group(0)}' found in output")
+                return "; ".join(explanation_facts)
             
             return polished
             
@@ -121,6 +158,25 @@ Write a clear, professional summary:"""
             print(f"⚠️ LLM error: {e}")
             return "; ".join(explanation_facts)
     
+    async def polish_many(self, batch: List[Tuple[List[str], str]],
+                          concurrency: int = POLISH_CONCURRENCY) -> List[str]:
+        """
+        Polish many (facts, risk_level) pairs with up to `concurrency` LLM calls
+        in flight, so the model isn't idle between patients. Each call runs
+        `polish` in a worker thread (same cache, streaming and safety check).
+        Usage: asyncio.run(explainer.polish_many(batch))
+        
+        Returns:
+            Polished explanations, in batch order
+        """
+        sem = asyncio.Semaphore(concurrency)
+        
+        async def one(facts: List[str], risk_level: str) -> str:
+            async with sem:
+                return await asyncio.to_thread(self.polish, facts, risk_level)
+        
+        return await asyncio.gather(*(one(facts, risk_level) for facts, risk_level in batch))
+    
     def polish_explanation(self, explanation: Dict[str, Any]) -> Dict[str, Any]:
         """
         Polish a complete explanation dict from the ExplanationEngine.